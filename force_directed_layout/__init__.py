@@ -1,10 +1,16 @@
 from .layout import ForceSimulation
 from .point import VPoint
 from .quadtree import QuadTree
+from .spatial import SpatialIndex
+from .storage import ArrayStorage, NodeState
+from .lod import LevelOfDetailIndex, LevelOfDetail
+from .instrument import Profiler
+from .aio import AsyncSimulation
+from .service import LayoutJob, LayoutService
 
-from .layouts.base import ForceLayoutBase, Fn
+from .layouts.base import ForceLayoutBase, Fn, Jitter, Vectorized
 from .layouts.collide import CollisionLayout
-from .layouts.linkage import VLinkage, LinkageForceDirectedLayout
+from .layouts.linkage import VLinkage, LinkArray, LinkageForceDirectedLayout
 from .layouts.manybody import ManyBodyForcesLayout
 from .layouts.xy import XForceLayout, YForceLayout, RadialForceDirectedLayout
 
@@ -13,10 +19,22 @@ __all__ = [
     "ForceSimulation",
     "VPoint",
     "QuadTree",
+    "SpatialIndex",
+    "ArrayStorage",
+    "NodeState",
+    "LevelOfDetailIndex",
+    "LevelOfDetail",
+    "Profiler",
+    "AsyncSimulation",
+    "LayoutJob",
+    "LayoutService",
     "ForceLayoutBase",
     "Fn",
+    "Jitter",
+    "Vectorized",
     "CollisionLayout",
     "VLinkage",
+    "LinkArray",
     "LinkageForceDirectedLayout",
     "ManyBodyForcesLayout",
     "XForceLayout",
@@ -0,0 +1,174 @@
+import asyncio
+import time
+
+from concurrent.futures import Executor
+from typing import Awaitable, List, NamedTuple, Optional
+
+import numpy as np
+
+from .layout import ForceSimulation
+
+
+class Frame(NamedTuple):
+    """A snapshot of a running simulation"""
+
+    ticks: int
+    alpha: float
+    positions: np.ndarray
+    done: bool
+
+
+class Subscription:
+    """An async iterator over the frames published by an :class:`AsyncSimulation`.
+
+    Only the latest frame is kept, so a slow consumer skips frames rather than holding
+    up the simulation, but it always receives the final one, after which iteration
+    stops.
+    """
+
+    def __init__(self, driver: "AsyncSimulation"):
+        self.driver = driver
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Frame:
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        frame = await self._queue.get()
+        if frame.done:
+            self.close()
+        return frame
+
+    def put(self, frame: Frame):
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(frame)
+
+    def close(self):
+        self.closed = True
+        if self in self.driver.subscriptions:
+            self.driver.subscriptions.remove(self)
+
+
+class AsyncSimulation:
+    """Runs a :class:`~.ForceSimulation` without blocking an asyncio event loop.
+
+    Ticks run in slices of about ``slice_seconds``, between which control returns to
+    the event loop and a :class:`Frame` is published to every :meth:`subscribe`-r.
+    Slices run on the event loop itself, or on ``executor`` if one is given, which
+    must be a thread pool as the simulation is not copied. Cancelling :meth:`run`
+    stops the simulation at the end of its current tick.
+    """
+
+    simulation: ForceSimulation
+    slice_seconds: float
+    executor: Optional[Executor]
+    subscriptions: List[Subscription]
+    frame: Optional[Frame]
+
+    def __init__(
+        self,
+        simulation: ForceSimulation,
+        slice_seconds: float = 0.01,
+        executor: Optional[Executor] = None,
+    ):
+        self.simulation = simulation
+        self.slice_seconds = slice_seconds
+        self.executor = executor
+        self.subscriptions = []
+        self.frame = None
+        self.running = False
+        self._stop = False
+
+    def __repr__(self):
+        state = "running" if self.running else "idle"
+        return f"{self.__class__.__name__}({self.simulation.ticks} ticks, {state})"
+
+    def subscribe(self) -> Subscription:
+        """Receive the frames published from now on"""
+        subscription = Subscription(self)
+        if self.frame is not None and self.frame.done and not self.running:
+            subscription.put(self.frame)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def publish(self, done: bool = False) -> Frame:
+        sim = self.simulation
+        self.frame = Frame(sim.ticks, sim.alpha, sim.positions(), done)
+        for subscription in list(self.subscriptions):
+            subscription.put(self.frame)
+        return self.frame
+
+    def _finished(self, remaining: Optional[int]) -> bool:
+        if remaining is not None:
+            return remaining <= 0
+        return self.simulation.alpha < self.simulation.alpha_min
+
+    def run_slice(self, remaining: Optional[int] = None) -> int:
+        """Tick for about ``slice_seconds``, returning the number of ticks"""
+        deadline = time.perf_counter() + self.slice_seconds
+        done = 0
+        while not self._stop and not self._finished(
+            None if remaining is None else remaining - done
+        ):
+            self.simulation.tick()
+            done += 1
+            if time.perf_counter() >= deadline:
+                break
+        return done
+
+    def run(self, ticks: Optional[int] = None) -> Awaitable[ForceSimulation]:
+        """Tick until ``alpha`` falls below ``alpha_min``, or for ``ticks`` ticks.
+
+        The simulation counts as running from this call rather than from when the
+        result is first awaited, so that frames from an earlier run are never mistaken
+        for this one's.
+        """
+        if self.running:
+            raise RuntimeError("The simulation is already running")
+        self.running = True
+        self._stop = False
+        return self._run(ticks)
+
+    async def _run(self, ticks: Optional[int]) -> ForceSimulation:
+        loop = asyncio.get_running_loop()
+        remaining = ticks
+        try:
+            while not self._finished(remaining):
+                if self.executor is None:
+                    done = self.run_slice(remaining)
+                else:
+                    future = loop.run_in_executor(
+                        self.executor, self.run_slice, remaining
+                    )
+                    try:
+                        done = await asyncio.shield(future)
+                    except asyncio.CancelledError:
+                        # The slice can't be interrupted, so ask it to stop and wait
+                        # for it rather than leave it ticking behind our back
+                        self._stop = True
+                        await asyncio.wait([future])
+                        raise
+                if remaining is not None:
+                    remaining -= done
+                self.publish()
+                await asyncio.sleep(0)
+        finally:
+            self.running = False
+            self.publish(done=True)
+        return self.simulation
+
+    def start(self, ticks: Optional[int] = None) -> "asyncio.Task[ForceSimulation]":
+        """Schedule :meth:`run` as a task, which can be awaited or cancelled"""
+        task = asyncio.ensure_future(self.run(ticks))
+        task.add_done_callback(self._settle)
+        return task
+
+    def _settle(self, task: asyncio.Task):
+        # A task cancelled before its first step never enters `_run`
+        if self.running:
+            self.running = False
+            self.publish(done=True)
@@ -0,0 +1,39 @@
+from .generators import (
+    Graph,
+    GENERATORS,
+    random_geometric,
+    scale_free,
+    grid,
+    tree,
+    components,
+)
+from .suite import (
+    DEFAULT_SIZES,
+    FORCES,
+    build_simulation,
+    measure,
+    run_graph,
+    run,
+    save,
+    load,
+    compare,
+)
+
+__all__ = [
+    "Graph",
+    "GENERATORS",
+    "random_geometric",
+    "scale_free",
+    "grid",
+    "tree",
+    "components",
+    "DEFAULT_SIZES",
+    "FORCES",
+    "build_simulation",
+    "measure",
+    "run_graph",
+    "run",
+    "save",
+    "load",
+    "compare",
+]
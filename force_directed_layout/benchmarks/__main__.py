@@ -0,0 +1,78 @@
+"""Run the benchmarks, e.g.
+
+    python -m force_directed_layout.benchmarks --sizes 100 1000 \
+        --output results.json --baseline baseline.json
+"""
+
+import argparse
+import sys
+
+from .generators import GENERATORS
+from .suite import DEFAULT_SIZES, compare, load, run, save
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m force_directed_layout.benchmarks")
+    parser.add_argument("--graphs", nargs="+", choices=sorted(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES))
+    parser.add_argument(
+        "--steps", nargs="+", help="only run steps starting with these names"
+    )
+    parser.add_argument("--ticks", type=int, default=1)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--metrics", action="store_true", help="score the layout left by the ticks"
+    )
+    parser.add_argument(
+        "--no-memory", action="store_true", help="skip measuring peak memory"
+    )
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="compare against this JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    def progress(result):
+        peak = result["peak_bytes"]
+        peak = "" if peak is None else f"{peak / 2**20:10.1f} MiB"
+        print(
+            f"{result['graph']:>16} {result['nodes']:>8} {result['step']:<20}"
+            f"{result['seconds']:12.6f} s {result['per_second'] or 0:14.0f}/s {peak}",
+            flush=True,
+        )
+        for name, value in result.get("metrics", {}).items():
+            print(f"{'':>26}{name:<20}{value:12.6g}")
+
+    results = run(
+        graphs=args.graphs,
+        sizes=args.sizes,
+        seed=args.seed,
+        progress=progress,
+        steps=args.steps,
+        ticks=args.ticks,
+        queries=args.queries,
+        repeat=args.repeat,
+        memory=not args.no_memory,
+        metrics=args.metrics,
+    )
+    if args.output:
+        save(results, args.output)
+    if args.baseline:
+        regressions = 0
+        for row in compare(results, load(args.baseline), args.tolerance):
+            flag = "  REGRESSION" if row["regression"] else ""
+            regressions += row["regression"]
+            print(
+                f"{row['graph']:>16} {row['nodes']:>8} {row['step']:<20}"
+                f"{row['ratio']:8.2f}x{flag}"
+            )
+            for name, (value, old) in row.get("metrics", {}).items():
+                old = "n/a" if old is None else f"{old:.6g}"
+                print(f"{'':>26}{name:<20}{value:12.6g} (was {old})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
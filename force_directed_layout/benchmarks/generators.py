@@ -0,0 +1,137 @@
+import math
+
+from typing import Callable, Dict, NamedTuple
+
+import numpy as np
+
+
+class Graph(NamedTuple):
+    """A synthetic graph given as arrays of link endpoints"""
+
+    name: str
+    n: int
+    sources: np.ndarray
+    targets: np.ndarray
+
+    def __len__(self):
+        return self.n
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"{name}({self.name!r}, n={self.n}, m={len(self.sources)})"
+
+
+def random_geometric(n: int, degree: float = 6.0, seed: int = 0) -> Graph:
+    """Link every pair of ``n`` uniform points in the unit square that are closer than
+    the radius giving an average of ``degree`` links per node.
+    """
+    random = np.random.RandomState(seed)
+    xy = random.random_sample((n, 2))
+    radius = math.sqrt(degree / (math.pi * max(n, 1)))
+    side = max(int(1 / radius), 1)
+    cells = np.minimum((xy * side).astype(np.intp), side - 1)
+    cell = cells[:, 0] * side + cells[:, 1]
+    order = np.argsort(cell, kind="stable")
+    sizes = np.bincount(cell, minlength=side * side)
+    starts = np.zeros_like(sizes)
+    np.cumsum(sizes[:-1], out=starts[1:])
+
+    # Compare every point against the points in its own cell and in four of its
+    # neighbors, which between them see each neighboring pair of cells once
+    sources = []
+    targets = []
+    for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1), (1, -1)):
+        cx = cells[:, 0] + dx
+        cy = cells[:, 1] + dy
+        valid = np.flatnonzero((cx < side) & (0 <= cy) & (cy < side))
+        other = cx[valid] * side + cy[valid]
+        count = sizes[other]
+        total = int(count.sum())
+        i = np.repeat(valid, count)
+        offsets = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+        j = order[np.repeat(starts[other], count) + offsets]
+        keep = np.sum((xy[i] - xy[j]) ** 2, axis=1) < radius * radius
+        if dx == dy == 0:
+            keep &= i < j
+        sources.append(i[keep])
+        targets.append(j[keep])
+    return Graph(
+        "random_geometric", n, np.concatenate(sources), np.concatenate(targets)
+    )
+
+
+def scale_free(n: int, m: int = 2, seed: int = 0) -> Graph:
+    """Grow a Barabási-Albert graph where each new node links to ``m`` earlier nodes
+    chosen in proportion to their degree.
+    """
+    random = np.random.RandomState(seed)
+    count = max(n - 1, 0)
+    picks = random.random_sample((count, m))
+    # Node i picks uniformly from the list of every link endpoint so far, which holds
+    # node 0 and then, for each node j, its m targets followed by m copies of j
+    sizes = 1 + 2 * m * np.arange(count)
+    positions = (picks * sizes[:, None]).astype(np.intp).reshape(-1)
+    targets = np.empty_like(positions)
+    pending = np.arange(len(positions))
+    found = positions.copy()
+    while len(pending):
+        p = found[pending]
+        block, offset = np.divmod(p - 1, 2 * m)
+        first = p == 0
+        own = (offset >= m) & ~first
+        targets[pending[first]] = 0
+        targets[pending[own]] = block[own] + 1
+        # Anything else is one of the targets of an earlier node, so follow its pick
+        rest = ~(first | own)
+        found[pending[rest]] = positions[block[rest] * m + offset[rest]]
+        pending = pending[rest]
+    sources = np.repeat(np.arange(1, max(n, 1), dtype=np.intp), m)
+    return Graph("scale_free", n, sources, targets)
+
+
+def grid(n: int, seed: int = 0) -> Graph:
+    """Lay ``n`` nodes out row by row on a square lattice, linking each to the nodes to
+    its right and below.
+    """
+    width = max(int(math.ceil(math.sqrt(n))), 1)
+    index = np.arange(n)
+    right = index[(index % width < width - 1) & (index + 1 < n)]
+    down = index[index + width < n]
+    return Graph(
+        "grid",
+        n,
+        np.concatenate([right, down]),
+        np.concatenate([right + 1, down + width]),
+    )
+
+
+def tree(n: int, seed: int = 0) -> Graph:
+    """Grow a random recursive tree, linking each node to a uniformly chosen earlier
+    node.
+    """
+    random = np.random.RandomState(seed)
+    children = np.arange(1, n)
+    parents = (random.random_sample(len(children)) * children).astype(np.intp)
+    return Graph("tree", n, children, parents)
+
+
+def components(n: int, size: int = 10, seed: int = 0) -> Graph:
+    """Split ``n`` nodes into many disconnected random trees of ``size`` nodes"""
+    random = np.random.RandomState(seed)
+    index = np.arange(n)
+    local = index % size
+    children = index[local > 0]
+    local = local[local > 0]
+    parents = (
+        children - local + (random.random_sample(len(local)) * local).astype(np.intp)
+    )
+    return Graph("components", n, children, parents)
+
+
+GENERATORS: Dict[str, Callable[..., Graph]] = {
+    "random_geometric": random_geometric,
+    "scale_free": scale_free,
+    "grid": grid,
+    "tree": tree,
+    "components": components,
+}
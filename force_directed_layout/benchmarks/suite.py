@@ -0,0 +1,269 @@
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..layout import ForceSimulation
+from ..metrics import layout_metrics
+from ..point import VPoint
+from ..quadtree import QuadTree
+from ..spatial import SpatialIndex
+from ..layouts.base import Fn, ForceLayoutBase
+from ..layouts.collide import CollisionLayout
+from ..layouts.linkage import VLinkage, LinkArray, LinkageForceDirectedLayout
+from ..layouts.manybody import ManyBodyForcesLayout
+from ..layouts.xy import XForceLayout, YForceLayout, RadialForceDirectedLayout
+from .generators import GENERATORS, Graph
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+FORCES: Dict[str, Callable[[List[VPoint], List[VLinkage]], ForceLayoutBase]] = {
+    "link": lambda nodes, links: LinkageForceDirectedLayout(nodes, links),
+    "charge": lambda nodes, links: ManyBodyForcesLayout(nodes),
+    "collide": lambda nodes, links: CollisionLayout(nodes, Fn(3.0)),
+    "x": lambda nodes, links: XForceLayout(nodes),
+    "y": lambda nodes, links: YForceLayout(nodes),
+    "radial": lambda nodes, links: RadialForceDirectedLayout(nodes, radius=Fn(50.0)),
+}
+
+
+def build_simulation(
+    graph: Graph, forces: Optional[Iterable[str]] = None, dtype=np.float64
+) -> ForceSimulation:
+    """Set up a simulation of ``graph`` with the named ``forces``, all by default"""
+    nan = np.full(graph.n, np.nan)
+    nodes = VPoint.from_arrays(nan, nan)
+    links = LinkArray(nodes, graph.sources, graph.targets)
+    sim = ForceSimulation(nodes, dtype=dtype)
+    for name in FORCES if forces is None else forces:
+        sim.add_force(name, FORCES[name](nodes, links))
+    sim.init_nodes()
+    sim.init_forces()
+    return sim
+
+
+def measure(
+    fn: Callable[..., Any],
+    repeat: int = 5,
+    memory: bool = True,
+    setup: Optional[Callable[[], Any]] = None,
+    min_seconds: float = 0.2,
+) -> Tuple[float, Optional[int]]:
+    """Time the fastest of at least ``repeat`` calls to ``fn``, making more calls
+    until they add up to ``min_seconds`` so that quick steps are timed as reliably
+    as slow ones, and if ``memory`` is set, the peak memory allocated during one more
+    call made under :mod:`tracemalloc`.
+
+    If ``setup`` is given, every call is passed a new result of ``setup``, which is
+    neither timed nor traced. The garbage collector is paused while timing, as in
+    :mod:`timeit`.
+    """
+
+    def call():
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        fn(*args)
+        return time.perf_counter() - start
+
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        times = [call() for _ in range(repeat)]
+        while sum(times) < min_seconds and len(times) < 1000 * repeat:
+            times.append(call())
+    finally:
+        if enabled:
+            gc.enable()
+    best = min(times)
+    peak = None
+    if memory:
+        args = () if setup is None else (setup(),)
+        # Tracing slows everything down, so it gets a call of its own
+        tracemalloc.start()
+        try:
+            fn(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_graph(
+    graph: Graph,
+    steps: Optional[Sequence[str]] = None,
+    ticks: int = 1,
+    queries: int = 1000,
+    repeat: int = 5,
+    memory: bool = True,
+    seed: int = 0,
+    metrics: bool = False,
+) -> List[Dict[str, Any]]:
+    """Benchmark each step on ``graph``, or only those whose names start with one of
+    ``steps``. The steps are ``quadtree`` for :meth:`.QuadTree.from_points`,
+    ``<force>.initialize`` and ``<force>.force`` for each of :data:`FORCES`, ``tick``
+    for ``ticks`` ticks of every force together and ``find`` for ``queries`` lookups
+    in the :class:`.SpatialIndex` built by ``index``, over the layout after those
+    ticks. Each step reports the best of ``repeat`` timings.
+
+    The steps which move the nodes start from a newly built simulation every time,
+    so their results do not depend on how often they ran or on which other steps
+    ran before them. With ``metrics`` set, the layout after ``ticks`` ticks is also
+    scored with :func:`.layout_metrics` as a ``metrics`` step, so that speed and
+    quality can be compared side by side.
+    """
+    results = []
+    sim = build_simulation(graph)
+    n_links = len(graph.sources)
+
+    def record(
+        step: str,
+        items: int,
+        fn: Callable[..., Any],
+        setup: Optional[Callable[[], Any]] = None,
+        **extra,
+    ):
+        if steps is not None and not any(step.startswith(s) for s in steps):
+            return
+        seconds, peak = measure(fn, repeat=repeat, memory=memory, setup=setup)
+        results.append(
+            {
+                **extra,
+                "graph": graph.name,
+                "nodes": graph.n,
+                "links": n_links,
+                "step": step,
+                "items": items,
+                "seconds": seconds,
+                "per_second": items / seconds if seconds else None,
+                "peak_bytes": peak,
+            }
+        )
+
+    def fresh() -> ForceSimulation:
+        return build_simulation(graph)
+
+    record("quadtree", graph.n, lambda: QuadTree.from_points(sim.nodes))
+    for name, force in sim.forces.items():
+        items = n_links if name == "link" else graph.n
+        record(f"{name}.initialize", items, force.initialize)
+        record(
+            f"{name}.force",
+            items,
+            lambda other, name=name: other.forces[name](other.alpha),
+            setup=fresh,
+        )
+    record("tick", graph.n * ticks, lambda other: other.tick(ticks), setup=fresh)
+
+    sim.tick(ticks)
+    if metrics:
+        scores = layout_metrics(sim, seed=seed)
+        record(
+            "metrics",
+            graph.n,
+            lambda: layout_metrics(sim, seed=seed),
+            metrics=scores,
+            ticks=sim.ticks,
+        )
+
+    random = np.random.RandomState(seed)
+    xy = sim.positions()
+    lo = np.nanmin(xy, axis=0) if graph.n else np.zeros(2)
+    hi = np.nanmax(xy, axis=0) if graph.n else np.zeros(2)
+    points = (lo + random.random_sample((queries, 2)) * (hi - lo)).tolist()
+
+    def find():
+        for x, y in points:
+            sim.find(x, y)
+
+    record("index", graph.n, lambda: SpatialIndex(xy, dtype=sim.dtype))
+    sim.spatial_index()
+    record("find", queries, find)
+    return results
+
+
+def run(
+    graphs: Optional[Iterable[str]] = None,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    seed: int = 0,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    **kwargs,
+) -> Dict[str, Any]:
+    """Benchmark every generator in ``graphs``, all of :data:`GENERATORS` by default,
+    at each of ``sizes``. Other arguments are passed to :func:`run_graph`.
+    """
+    results = []
+    for name in GENERATORS if graphs is None else graphs:
+        for n in sizes:
+            graph = GENERATORS[name](n, seed=seed)
+            for result in run_graph(graph, seed=seed, **kwargs):
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+    return {"meta": environment(seed=seed), "results": results}
+
+
+def environment(**extra) -> Dict[str, Any]:
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        **extra,
+    }
+
+
+def save(results: Dict[str, Any], path: os.PathLike):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load(path: os.PathLike) -> Dict[str, Any]:
+    with open(path) as f:
+        return json.load(f)
+
+
+def _key(result: Dict[str, Any]) -> Tuple[str, int, str]:
+    return result["graph"], result["nodes"], result["step"]
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.1
+) -> List[Dict[str, Any]]:
+    """Match each result to the baseline result for the same graph, size and step.
+    ``ratio`` is the best time taken relative to the baseline's best time, and a
+    result is a ``regression`` if it is more than ``tolerance`` slower. Layout
+    metrics are paired up as ``(current, baseline)``, where the baseline value is
+    :const:`None` if it was not recorded.
+    """
+    before = {_key(r): r for r in baseline["results"]}
+    comparison = []
+    for result in results["results"]:
+        old = before.get(_key(result))
+        if old is None or not old["seconds"]:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        comparison.append(
+            {
+                "graph": result["graph"],
+                "nodes": result["nodes"],
+                "step": result["step"],
+                "seconds": result["seconds"],
+                "baseline": old["seconds"],
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance,
+            }
+        )
+        if "metrics" in result and "metrics" in old:
+            comparison[-1]["metrics"] = {
+                name: (value, old["metrics"].get(name))
+                for name, value in result["metrics"].items()
+            }
+    return comparison
@@ -0,0 +1,186 @@
+import json
+import math
+import os
+
+from typing import Callable, Dict, List, Optional, Sequence, TextIO, Tuple
+
+import numpy as np
+
+from .layouts.base import _FieldFn
+from .layouts.linkage import LinkArray, LinkageForceDirectedLayout
+
+
+def node_columns(
+    simulation, fields: Optional[Sequence[str]] = None
+) -> Dict[str, np.ndarray]:
+    """Collect the ``id``, ``x`` and ``y`` of every node along with ``fields``, all
+    of :attr:`~.ForceSimulation.columns` by default, as arrays.
+
+    Ids are :attr:`~.ForceSimulation.node_ids`, or the node indices if there are
+    none. Positions come from :meth:`~.ForceSimulation.node_state`. Fields which are
+    not columns are read from each node's ``data`` instead, which is much slower.
+    """
+    state = simulation.node_state()
+    n = len(simulation.nodes)
+    ids = simulation.node_ids
+    columns = {
+        "id": np.arange(n) if ids is None else ids,
+        "x": state.x,
+        "y": state.y,
+    }
+    for name in simulation.columns if fields is None else fields:
+        if name in columns:
+            raise ValueError(f"The field {name!r} clashes with a built-in column")
+        if name in simulation.columns:
+            columns[name] = simulation.columns[name]
+        else:
+            columns[name] = _FieldFn(name).evaluate(simulation.nodes, dtype=object)
+    return columns
+
+
+def link_columns(simulation) -> Dict[str, np.ndarray]:
+    """Collect the ``source`` and ``target`` node indices of the links of every
+    link force as arrays.
+    """
+    sources = []
+    targets = []
+    for force in simulation.forces.values():
+        if not isinstance(force, LinkageForceDirectedLayout):
+            continue
+        if isinstance(force.links, LinkArray):
+            sources.append(force.links.sources)
+            targets.append(force.links.targets)
+        else:
+            if not hasattr(force, "sources"):
+                force.initialize()
+            sources.append(force.sources)
+            targets.append(force.targets)
+    if not sources:
+        return {
+            "source": np.zeros(0, dtype=np.intp),
+            "target": np.zeros(0, dtype=np.intp),
+        }
+    return {"source": np.concatenate(sources), "target": np.concatenate(targets)}
+
+
+def to_npz(
+    simulation,
+    path: os.PathLike,
+    fields: Optional[Sequence[str]] = None,
+    compressed: bool = False,
+):
+    """Write the node columns and the link columns into one ``.npz`` file"""
+    arrays = {**node_columns(simulation, fields), **link_columns(simulation)}
+    # Keep the file loadable without pickles where the values allow it
+    arrays = {name: _native(values) for name, values in arrays.items()}
+    save = np.savez_compressed if compressed else np.savez
+    save(path, **arrays)
+
+
+def to_arrow(simulation, fields: Optional[Sequence[str]] = None) -> Tuple:
+    """Convert the node and link columns into a pair of :class:`pyarrow.Table`"""
+    try:
+        import pyarrow as pa
+    except ImportError as e:
+        raise ImportError("Exporting to Arrow requires pyarrow") from e
+    nodes = pa.table(
+        {
+            name: pa.array(values.tolist() if values.dtype == object else values)
+            for name, values in node_columns(simulation, fields).items()
+        }
+    )
+    links = pa.table(link_columns(simulation))
+    return nodes, links
+
+
+def to_parquet(
+    simulation,
+    nodes_path: os.PathLike,
+    links_path: Optional[os.PathLike] = None,
+    fields: Optional[Sequence[str]] = None,
+):
+    """Write the node columns, and the link columns if ``links_path`` is given, to
+    Parquet files.
+    """
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Exporting to Parquet requires pyarrow") from e
+    nodes, links = to_arrow(simulation, fields)
+    pq.write_table(nodes, nodes_path)
+    if links_path is not None:
+        pq.write_table(links, links_path)
+
+
+def _native(values: np.ndarray) -> np.ndarray:
+    """Convert an object array to a native dtype if its values all share one"""
+    if values.dtype != object:
+        return values
+    items = values.tolist()
+    plain = np.asarray(items)
+    if plain.ndim != 1 or plain.dtype == object:
+        return values
+    # Numbers mixed with strings would otherwise all become strings
+    if plain.dtype.kind in "US" and not all(isinstance(x, str) for x in items):
+        return values
+    return plain
+
+
+def _dumps(x) -> str:
+    if isinstance(x, float) and not math.isfinite(x):
+        return "null"
+    return json.dumps(x, default=str)
+
+
+def _encoder(values: np.ndarray) -> Callable[[list], List[str]]:
+    kind = values.dtype.kind
+    if kind == "f":
+        return lambda xs: [repr(x) if math.isfinite(x) else "null" for x in xs]
+    if kind in "iu":
+        return lambda xs: list(map(str, xs))
+    if kind == "b":
+        return lambda xs: ["true" if x else "false" for x in xs]
+    return lambda xs: list(map(_dumps, xs))
+
+
+def _write_rows(columns: Dict[str, np.ndarray], stream: TextIO, chunk_size: int):
+    columns = {name: _native(values) for name, values in columns.items()}
+    names = list(columns)
+    encoders = [_encoder(columns[name]) for name in names]
+    keys = [json.dumps(name).replace("%", "%%") for name in names]
+    template = "{" + ", ".join(f"{key}: %s" for key in keys) + "}\n"
+    n = len(next(iter(columns.values()))) if columns else 0
+    for start in range(0, n, chunk_size):
+        chunk = slice(start, min(start + chunk_size, n))
+        encoded = [
+            encode(columns[name][chunk].tolist())
+            for name, encode in zip(names, encoders)
+        ]
+        stream.write("".join(template % row for row in zip(*encoded)))
+
+
+def write_jsonl(
+    simulation,
+    stream: TextIO,
+    fields: Optional[Sequence[str]] = None,
+    chunk_size: Optional[int] = None,
+):
+    """Write one JSON object per node holding its node columns to ``stream``,
+    ``chunk_size`` nodes at a time, which defaults to the simulation's storage.
+    Values which are not finite are written as ``null``.
+    """
+    chunk_size = chunk_size or simulation.storage.chunk_size
+    _write_rows(node_columns(simulation, fields), stream, chunk_size)
+
+
+def write_links_jsonl(
+    simulation, stream: TextIO, ids: bool = False, chunk_size: Optional[int] = None
+):
+    """Write one JSON object per link holding its ``source`` and ``target`` to
+    ``stream``, as node indices, or as node ids if ``ids`` is set.
+    """
+    chunk_size = chunk_size or simulation.storage.chunk_size
+    columns = link_columns(simulation)
+    if ids and simulation.node_ids is not None:
+        columns = {name: simulation.node_ids[ends] for name, ends in columns.items()}
+    _write_rows(columns, stream, chunk_size)
@@ -0,0 +1,119 @@
+import json
+
+from collections import defaultdict
+from time import perf_counter
+from typing import Any, Callable, DefaultDict, Dict, List, Optional, TextIO
+
+
+class Profiler:
+    """Records where the time goes in each :meth:`~.ForceSimulation.tick`.
+
+    Each tick produces a record holding its index, ``alpha``, its total wall time, the
+    time spent integrating, and for each force by name the wall time of the force as
+    ``time``. The many-body and collision forces also split this into ``build`` and
+    ``traverse`` time for their quadtrees, and count the tree cells they ``visits``.
+    Forces which the simulation fuses into its integration step are also counted as
+    ``fused``, and their ``time`` is that of their share of the fused pass, which is
+    left out of ``integrate``.
+
+    ``before_tick`` callbacks receive the simulation before each tick, and
+    ``after_tick`` callbacks receive the simulation and the tick's record after it.
+    """
+
+    records: List[Dict[str, Any]]
+    before_tick: List[Callable[[Any], None]]
+    after_tick: List[Callable[[Any, Dict[str, Any]], None]]
+
+    def __init__(
+        self,
+        before_tick: Optional[List[Callable[[Any], None]]] = None,
+        after_tick: Optional[List[Callable[[Any, Dict[str, Any]], None]]] = None,
+    ):
+        self.records = []
+        self.before_tick = list(before_tick or [])
+        self.after_tick = list(after_tick or [])
+        self._current = None
+        self._forces: DefaultDict[str, Dict[str, float]] = defaultdict(dict)
+        self._start = 0.0
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(<{len(self.records)} ticks>)"
+
+    def start_tick(self, simulation):
+        for callback in self.before_tick:
+            callback(simulation)
+        self._forces = defaultdict(dict)
+        self._current = {
+            "tick": None,
+            "alpha": None,
+            "time": 0.0,
+            "integrate": 0.0,
+            "forces": self._forces,
+        }
+        self._start = perf_counter()
+
+    def end_tick(self, simulation):
+        record = self._current
+        record["time"] = perf_counter() - self._start
+        record["tick"] = simulation.ticks
+        record["alpha"] = simulation.alpha
+        record["forces"] = {name: dict(entry) for name, entry in self._forces.items()}
+        self.records.append(record)
+        self._current = None
+        for callback in self.after_tick:
+            callback(simulation, record)
+
+    def add(self, name: Optional[str], key: str, value: float):
+        """Add ``value`` to the ``key`` entry of force ``name`` for this tick"""
+        entry = self._forces[name]
+        entry[key] = entry.get(key, 0) + value
+
+    def add_integration(self, seconds: float):
+        self._current["integrate"] += seconds
+
+    def counting(self, name: Optional[str], key: str, fn: Callable) -> Callable:
+        """Wrap ``fn`` so that each call adds one to the ``key`` entry of force
+        ``name`` for this tick.
+        """
+        entry = self._forces[name]
+        entry.setdefault(key, 0)
+
+        def counted(*args, **kwargs):
+            entry[key] += 1
+            return fn(*args, **kwargs)
+
+        return counted
+
+    def summary(self) -> Dict[str, Any]:
+        """Total the records by phase and by force, with per-tick means"""
+        n = len(self.records)
+        forces: DefaultDict[str, Dict[str, float]] = defaultdict(dict)
+        for record in self.records:
+            for name, entry in record["forces"].items():
+                totals = forces[name]
+                for key, value in entry.items():
+                    totals[key] = totals.get(key, 0) + value
+        summary = {
+            "ticks": n,
+            "time": sum(record["time"] for record in self.records),
+            "integrate": sum(record["integrate"] for record in self.records),
+            "forces": {},
+        }
+        for name, totals in forces.items():
+            summary["forces"][name] = {
+                **totals,
+                **{f"mean_{key}": value / n for key, value in totals.items()},
+            }
+        if n:
+            summary["mean_time"] = summary["time"] / n
+            summary["mean_integrate"] = summary["integrate"] / n
+        return summary
+
+    def write_jsonl(self, stream: TextIO):
+        """Write each tick's record to ``stream`` as one line of JSON"""
+        for record in self.records:
+            stream.write(json.dumps(record))
+            stream.write("\n")
+
+    def clear(self):
+        self.records = []
@@ -2,6 +2,7 @@ import math
 import warnings
 
 from dataclasses import dataclass, field
+from time import perf_counter
 from typing import (
     Optional,
     List,
@@ -13,20 +14,40 @@ from typing import (
     Callable,
     DefaultDict,
     Dict,
+    Iterable,
+    Sequence,
+    Tuple,
 )
 
 import numpy as np
 
+from .instrument import Profiler
 from .quadtree import QuadTree, QuadTreeNode
 from .point import VPoint
-from .layouts.base import Fn, _ConstFn, jiggle, isnull, ForceLayoutBase
+from .spatial import SpatialIndex
+from .storage import ArrayStorage, NodeState
+from .layouts.base import Fn, _ConstFn, Jitter, jiggle, isnull, ForceLayoutBase
 from .layouts.xy import XForceLayout, YForceLayout, RadialForceDirectedLayout
 from .layouts.manybody import ManyBodyForcesLayout
-from .layouts.linkage import VLinkage, LinkageForceDirectedLayout
+from .layouts.linkage import VLinkage, LinkArray, LinkageForceDirectedLayout
 
 
 @dataclass
 class ForceSimulation:
+    """Advances a set of nodes under a collection of named forces.
+
+    ``dtype`` sets the precision of the per-node and per-link arrays precomputed by the
+    forces and of :attr:`state`. The nodes keep their positions and velocities as
+    Python floats whatever the precision, so ``np.float32`` halves the memory and the
+    memory traffic of those arrays but not of the nodes, and only rounds the force
+    parameters. The simulation amplifies that rounding as it runs: after a full 300
+    tick run nodes are typically within about 1% of the layout's extent of their
+    ``np.float64`` positions, but can be 10% or more away in graphs such as grids
+    which can settle in several ways. Measures of the layout's quality like
+    :func:`~.metrics.stress` typically agree to within a few percent, about as much
+    as they change when the initial layout is scaled by ``1e-4``.
+    """
+
     nodes: List[VPoint] = field(default_factory=list)
     initial_radius: float = 10.0
     initial_angle: float = math.pi * (3 - math.sqrt(5))
@@ -39,14 +60,176 @@ class ForceSimulation:
     random: np.random.RandomState = field(
         default_factory=lambda: np.random.RandomState(42)
     )
+    dtype: np.dtype = np.dtype(np.float64)
+    # Allocates the forces' arrays and `state`, optionally as memory-mapped files
+    storage: ArrayStorage = field(default_factory=ArrayStorage)
+    active: Optional[List[VPoint]] = field(default=None, repr=False)
+    profiler: Optional[Profiler] = field(default=None, repr=False)
+    node_ids: Optional[np.ndarray] = field(default=None, repr=False)
+    columns: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)
+    state: Optional[NodeState] = field(default=None, init=False, repr=False)
+    jitter: Jitter = field(init=False, repr=False)
+    ticks: int = field(default=0, init=False, repr=False)
+    _index: Optional[SpatialIndex] = field(default=None, init=False, repr=False)
+    _index_ticks: int = field(default=-1, init=False, repr=False)
+    _state_ticks: int = field(default=-1, init=False, repr=False)
+
+    def __post_init__(self):
+        self.dtype = np.dtype(self.dtype)
+        self.jitter = Jitter(self.random)
+
+    @classmethod
+    def from_edges(
+        cls,
+        sources: Sequence,
+        targets: Sequence,
+        ids: Optional[Sequence] = None,
+        distance=30.0,
+        strength=None,
+        charge=-30.0,
+        gravity=0.1,
+        columns: Optional[Dict[str, Sequence]] = None,
+        **kwargs,
+    ) -> "ForceSimulation":
+        """Build a simulation of the graph with a link from each of ``sources`` to
+        the node at the same position in ``targets``.
+
+        Nodes are identified by any values that :func:`numpy.unique` can sort. They
+        are numbered in the order of ``ids`` if given, which must then include every
+        endpoint, or in sorted order otherwise, and the values are kept as
+        :attr:`node_ids`. ``columns`` of per-node values in the same order are kept
+        as :attr:`columns`.
+
+        The simulation gets the standard forces: ``link``, with the given
+        ``distance`` and ``strength``, ``charge`` with a strength of ``charge``, and
+        ``x`` and ``y`` pulling towards the origin with a strength of ``gravity``.
+        Other arguments are passed to the constructor.
+        """
+        ids, sources, targets = _factorize(sources, targets, ids)
+        return cls._from_indices(
+            ids, sources, targets, distance, strength, charge, gravity, columns, kwargs
+        )
+
+    @classmethod
+    def from_networkx(
+        cls,
+        graph,
+        distance=30.0,
+        strength=None,
+        charge=-30.0,
+        gravity=0.1,
+        fields: Sequence[str] = (),
+        **kwargs,
+    ) -> "ForceSimulation":
+        """Build a simulation of a NetworkX ``graph`` as with :meth:`from_edges`.
+
+        Nodes are numbered in the graph's order. ``distance`` and ``strength`` may
+        name an edge attribute, and the node attributes named in ``fields`` are kept
+        as :attr:`columns`, with ``nan`` where they are missing.
+        """
+        nodes = list(graph.nodes)
+        ids = np.empty(len(nodes), dtype=object)
+        ids[:] = nodes
+        index = {node: i for i, node in enumerate(nodes)}
+        edges = list(graph.edges(data=True))
+        m = len(edges)
+        sources = np.fromiter((index[u] for u, _, _ in edges), dtype=np.intp, count=m)
+        targets = np.fromiter((index[v] for _, v, _ in edges), dtype=np.intp, count=m)
+        if isinstance(distance, str):
+            distance = np.array([data[distance] for _, _, data in edges], dtype=float)
+        if isinstance(strength, str):
+            strength = np.array([data[strength] for _, _, data in edges], dtype=float)
+        columns = {
+            name: np.array([graph.nodes[node].get(name, np.nan) for node in nodes])
+            for name in fields
+        }
+        return cls._from_indices(
+            ids, sources, targets, distance, strength, charge, gravity, columns, kwargs
+        )
+
+    @classmethod
+    def from_dataframe(
+        cls,
+        edges,
+        source: str = "source",
+        target: str = "target",
+        nodes=None,
+        id: str = "id",
+        distance=30.0,
+        strength=None,
+        charge=-30.0,
+        gravity=0.1,
+        fields: Optional[Sequence[str]] = None,
+        **kwargs,
+    ) -> "ForceSimulation":
+        """Build a simulation from a table of ``edges``, such as a pandas DataFrame,
+        as with :meth:`from_edges`.
+
+        ``distance`` and ``strength`` may name a column of ``edges``. If a table of
+        ``nodes`` is given, its ``id`` column gives the order of the nodes and its
+        other columns, or only those in ``fields``, are kept as :attr:`columns`.
+        """
+        if isinstance(distance, str):
+            distance = np.asarray(edges[distance], dtype=float)
+        if isinstance(strength, str):
+            strength = np.asarray(edges[strength], dtype=float)
+        ids = None
+        columns = {}
+        if nodes is not None:
+            ids = np.asarray(nodes[id])
+            names = [name for name in nodes if name != id] if fields is None else fields
+            columns = {name: np.asarray(nodes[name]) for name in names}
+        ids, sources, targets = _factorize(
+            np.asarray(edges[source]), np.asarray(edges[target]), ids
+        )
+        return cls._from_indices(
+            ids, sources, targets, distance, strength, charge, gravity, columns, kwargs
+        )
+
+    @classmethod
+    def _from_indices(
+        cls,
+        ids: np.ndarray,
+        sources: np.ndarray,
+        targets: np.ndarray,
+        distance,
+        strength,
+        charge,
+        gravity,
+        columns: Optional[Dict[str, Sequence]],
+        kwargs: Dict[str, Any],
+    ) -> "ForceSimulation":
+        n = len(ids)
+        columns = {name: np.asarray(values) for name, values in (columns or {}).items()}
+        for name, values in columns.items():
+            if len(values) != n:
+                raise ValueError(f"Expected {n} values of {name!r}, got {len(values)}")
+        nan = np.full(n, np.nan)
+        nodes = VPoint.from_arrays(nan, nan)
+        sim = cls(nodes, **kwargs)
+        sim.node_ids = ids
+        sim.columns = columns
+        links = LinkArray(nodes, sources, targets)
+        sim.add_force(
+            "link",
+            LinkageForceDirectedLayout(
+                nodes, links, strength=strength, distance=distance
+            ),
+        )
+        sim.add_force("charge", ManyBodyForcesLayout(nodes, strength=charge))
+        sim.add_force("x", XForceLayout(nodes, strength=gravity))
+        sim.add_force("y", YForceLayout(nodes, strength=gravity))
+        return sim
 
     def add_force(self, name: str, force: ForceLayoutBase):
+        force.bind(self, name)
         self.forces[name] = force
 
     def remove_force(self, name: str):
         return self.forces.pop(name)
 
     def init_nodes(self):
+        self.invalidate_index()
         for i, node in enumerate(self.nodes):
             node.index = i
             if (node.fx is not None) and not node.fixed:
@@ -61,8 +244,28 @@ class ForceSimulation:
             if isnull(node.vx) or isnull(node.vy):
                 node.vy = node.vx = 0
 
+    def sync_state(self):
+        """Copy every node's position and velocity into :attr:`state`"""
+        if self.state is None or len(self.state) != len(self.nodes):
+            self.state = NodeState(self.storage, len(self.nodes), self.dtype)
+        self.state.gather(self.nodes)
+        self._state_ticks = self.ticks
+
+    def node_state(self) -> NodeState:
+        """Get :attr:`state`, first copying the nodes into it if they may have moved
+        since it was last brought up to date.
+        """
+        if (
+            self.state is None
+            or self._state_ticks != self.ticks
+            or len(self.state) != len(self.nodes)
+        ):
+            self.sync_state()
+        return self.state
+
     def init_forces(self):
-        for force in self.forces.values():
+        for name, force in self.forces.items():
+            force.bind(self, name)
             force.initialize()
 
     def __enter__(self):
@@ -72,36 +275,287 @@ class ForceSimulation:
 
     def tick(self, iterations: int = 1):
         for k in range(iterations):
+            profiler = self.profiler
+            if profiler is not None:
+                profiler.start_tick(self)
+            self.ticks += 1
             self.alpha += (self.alpha_target - self.alpha) * self.alpha_decay
-            for force in self.forces.values():
-                force(self.alpha)
-            for node in self.nodes:
-                if not node.fixed:
-                    if node.fx is None:
-                        node.vx *= self.velocity_decay
-                        node.x += node.vx
-                    else:
-                        node.x = node.fx
-                        node.vx = 0
-                    if node.fy is None:
-                        node.vy *= self.velocity_decay
-                        node.y += node.vy
+            fused = self.fused_forces()
+            for name, force in self.forces.items():
+                if name in fused:
+                    if profiler is not None:
+                        profiler.add(name, "fused", 1)
+                elif profiler is None:
+                    force(self.alpha)
+                else:
+                    start = perf_counter()
+                    force(self.alpha)
+                    profiler.add(name, "time", perf_counter() - start)
+            if profiler is not None:
+                start = perf_counter()
+            accelerated = 0.0
+            if self.active is None:
+                for chunk in self.storage.chunks(len(self.nodes)):
+                    nodes = self.nodes[chunk]
+                    if fused:
+                        accelerated += self.integrate_fused(
+                            fused.values(), nodes, chunk
+                        )
                     else:
-                        node.y = node.fy
-                        node.vy = 0
+                        self.integrate(nodes)
+            elif fused:
+                rows = np.array([node.index for node in self.active], dtype=np.intp)
+                accelerated += self.integrate_fused(fused.values(), self.active, rows)
+            else:
+                self.integrate(self.active)
+            if profiler is not None:
+                profiler.add_integration(perf_counter() - start - accelerated)
+                profiler.end_tick(self)
+        return self
+
+    def instrument(self, profiler: Optional[Profiler] = None) -> Profiler:
+        """Record a profile of every following tick into ``profiler``, or into a new
+        :class:`~.Profiler` if none is given. Without a profiler, :meth:`tick` does
+        no extra work.
+        """
+        if profiler is None:
+            profiler = Profiler()
+        self.profiler = profiler
+        for name, force in self.forces.items():
+            force.bind(self, name)
+        return profiler
+
+    def uninstrument(self) -> Optional[Profiler]:
+        """Stop profiling, returning the profiler that was attached"""
+        profiler = self.profiler
+        self.profiler = None
+        for name, force in self.forces.items():
+            force.bind(self, name)
+        return profiler
+
+    def integrate(self, nodes: List[VPoint]):
+        for node in nodes:
+            if not node.fixed:
+                if node.fx is None:
+                    node.vx *= self.velocity_decay
+                    node.x += node.vx
+                else:
+                    node.x = node.fx
+                    node.vx = 0
+                if node.fy is None:
+                    node.vy *= self.velocity_decay
+                    node.y += node.vy
+                else:
+                    node.y = node.fy
+                    node.vy = 0
+
+    def fused_forces(self) -> Dict[str, ForceLayoutBase]:
+        """Find the forces which :meth:`tick` folds into its integration step, applying
+        them in the same vectorized pass over the nodes.
+
+        These are the node-local forces which come after every other force, so that
+        running them node by node alongside the integration gives the same result as
+        running them one after another. A subclass of one of these forces which
+        replaces its :meth:`~.ForceLayoutBase.force` is only fused if it replaces
+        :meth:`~.ForceLayoutBase.accelerate` to match, and a force is only fused if it
+        acts on this simulation's own list of nodes rather than on some of them.
+        """
+        names = list(self.forces)
+        start = len(names)
+        while start:
+            force = self.forces[names[start - 1]]
+            if not force.local or force.nodes is not self.nodes:
+                break
+            start -= 1
+        return {name: self.forces[name] for name in names[start:]}
+
+    def integrate_fused(
+        self,
+        forces: Iterable[ForceLayoutBase],
+        nodes: List[VPoint],
+        rows: Union[slice, np.ndarray],
+    ) -> float:
+        """Apply the local ``forces`` to ``nodes``, which are at ``rows`` of the
+        simulation, then integrate them, in a single pass.
+
+        When profiling, each force's share of the pass is recorded as its ``time``,
+        and their total is returned so that it can be left out of the integration
+        time. Otherwise this returns zero.
+        """
+        profiler = self.profiler
+        accelerated = 0.0
+        n = len(nodes)
+        # Gathered in one pass, as reading the attributes dominates the cost
+        x = [0.0] * n
+        y = [0.0] * n
+        vx = [0.0] * n
+        vy = [0.0] * n
+        fx = [np.nan] * n
+        fy = [np.nan] * n
+        fixed = [False] * n
+        for i, node in enumerate(nodes):
+            x[i] = node.x
+            y[i] = node.y
+            vx[i] = node.vx
+            vy[i] = node.vy
+            if node.fx is not None:
+                fx[i] = node.fx
+            if node.fy is not None:
+                fy[i] = node.fy
+            if node.fixed:
+                fixed[i] = True
+        x, y, vx, vy, fx, fy = [
+            np.array(values, float) for values in (x, y, vx, vy, fx, fy)
+        ]
+        mobile = ~np.array(fixed, dtype=bool)
+
+        for force in forces:
+            if profiler is None:
+                force.accelerate(self.alpha, rows, x, y, vx, vy, mobile)
+            else:
+                start = perf_counter()
+                force.accelerate(self.alpha, rows, x, y, vx, vy, mobile)
+                seconds = perf_counter() - start
+                profiler.add(force.name, "time", seconds)
+                accelerated += seconds
+
+        for position, velocity, pinned_at in ((x, vx, fx), (y, vy, fy)):
+            pinned = np.isnan(pinned_at)
+            free = mobile & pinned
+            velocity[free] *= self.velocity_decay
+            position[free] += velocity[free]
+            pinned = mobile & ~pinned
+            position[pinned] = pinned_at[pinned]
+            velocity[pinned] = 0
+
+        for node, moved, xi, yi, vxi, vyi in zip(
+            nodes, mobile.tolist(), x.tolist(), y.tolist(), vx.tolist(), vy.tolist()
+        ):
+            if moved:
+                node.x = xi
+                node.y = yi
+                node.vx = vxi
+                node.vy = vyi
+        return accelerated
+
+    def neighborhood(
+        self, changed: Iterable[Union[VPoint, int]], hops: int = 1
+    ) -> List[VPoint]:
+        """Collect the nodes within ``hops`` links of any node in ``changed``"""
+        link_forces = [
+            force
+            for force in self.forces.values()
+            if isinstance(force, LinkageForceDirectedLayout)
+        ]
+        seen = {}
+        for node in changed:
+            if not isinstance(node, VPoint):
+                node = self.nodes[node]
+            seen[node.index] = node
+        frontier = list(seen.values())
+        for _ in range(hops):
+            next_frontier = []
+            for node in frontier:
+                for force in link_forces:
+                    for neighbor in force.neighbors(node):
+                        if neighbor.index not in seen:
+                            seen[neighbor.index] = neighbor
+                            next_frontier.append(neighbor)
+            frontier = next_frontier
+        return list(seen.values())
+
+    def restrict(self, active: Optional[Iterable[VPoint]] = None):
+        self.active = None if active is None else list(active)
+        for force in self.forces.values():
+            force.restrict(self.active)
+
+    def relax(
+        self,
+        changed: Iterable[Union[VPoint, int]],
+        hops: int = 1,
+        iterations: int = 1,
+    ):
+        """Simulate only the neighborhood of ``changed`` for ``iterations`` ticks.
+
+        Nodes outside of the neighborhood are held in place, and the forces summarize
+        them once up front, so the cost of each tick scales with the size of the
+        neighborhood rather than the size of the graph. That summary is kept for
+        later calls with the same neighborhood until an unrestricted :meth:`tick`, or
+        :meth:`invalidate_index` after moving other nodes by hand.
+        """
+        self.restrict(self.neighborhood(changed, hops))
+        try:
+            self.tick(iterations)
+        finally:
+            self.restrict(None)
         return self
 
-    def find(self, x, y, radius=None):
-        if radius is None:
-            radius = float("inf")
-        else:
-            radius *= radius
-        closest = None
-        for node in self.nodes:
-            dx = x - node.x
-            dy = y - node.y
-            d2 = dx**2 + dy**2
-            if d2 < radius:
-                closest = node
-                radius = d2
-        return closest
+    def invalidate_index(self):
+        """Discard the spatial index and anything else the forces have cached about the
+        node positions, and mark :attr:`state` as out of date, e.g. after moving nodes
+        outside of :meth:`tick`.
+        """
+        self._index = None
+        self._state_ticks = -1
+        for force in self.forces.values():
+            force.invalidate()
+
+    def positions(self) -> np.ndarray:
+        """Get the node positions as an ``(n, 2)`` array"""
+        state = self.node_state()
+        return np.column_stack((state.x, state.y))
+
+    def spatial_index(self) -> SpatialIndex:
+        """Get a :class:`SpatialIndex` over the current node positions, rebuilding it
+        only if the simulation has ticked since it was last built.
+        """
+        if self._index is None or self._index_ticks != self.ticks:
+            self._index = SpatialIndex(self.positions(), dtype=self.dtype)
+            self._index_ticks = self.ticks
+        return self._index
+
+    def find(self, x, y, radius=None) -> Optional[VPoint]:
+        i = self.spatial_index().nearest(x, y, radius)
+        if i < 0:
+            return None
+        return self.nodes[i]
+
+    def find_nearest(self, x, y, k: int, radius=None) -> List[VPoint]:
+        return [self.nodes[i] for i in self.spatial_index().knn(x, y, k, radius)]
+
+    def find_within(self, x, y, radius) -> List[VPoint]:
+        return [self.nodes[i] for i in self.spatial_index().within(x, y, radius)]
+
+
+def _factorize(
+    sources: Sequence, targets: Sequence, ids: Optional[Sequence] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Number the nodes named by ``sources`` and ``targets``, in the order of ``ids``
+    if given or in sorted order otherwise, returning the ids and the link endpoints
+    as positions in them.
+    """
+    sources = np.asarray(sources).reshape(-1)
+    targets = np.asarray(targets).reshape(-1)
+    if len(sources) != len(targets):
+        raise ValueError(f"Got {len(sources)} sources but {len(targets)} targets")
+    m = len(sources)
+    if ids is None:
+        ids, inverse = np.unique(
+            np.concatenate([sources, targets]), return_inverse=True
+        )
+        inverse = inverse.reshape(-1)
+        return ids, inverse[:m], inverse[m:]
+
+    ids = np.asarray(ids).reshape(-1)
+    order = np.argsort(ids, kind="stable")
+    ordered = ids[order]
+    if len(ordered) > 1 and (ordered[1:] == ordered[:-1]).any():
+        raise ValueError("Node ids must be unique")
+    ends = np.concatenate([sources, targets])
+    found = np.searchsorted(ordered, ends)
+    found[found == len(ordered)] = 0
+    missing = ordered[found] != ends if len(ordered) else np.ones(len(ends), bool)
+    if missing.any():
+        raise KeyError(f"Unknown node id {ends[np.argmax(missing)].item()!r}")
+    positions = order[found]
+    return ids, positions[:m], positions[m:]
@@ -1,21 +1,234 @@
 import math
 
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
+from ..instrument import Profiler
+from ..quadtree import QuadTree
+from ..storage import ArrayStorage
+
+
+def jiggle() -> float:
+    return (np.random.random() - 0.5) * 1e-6
+
+
+class Jitter:
+    """A reproducible source of the tiny offsets used to separate coincident nodes.
+
+    Values are drawn from ``random`` ``block_size`` at a time and handed out one by
+    one, which is much cheaper than drawing each value separately.
+    """
+
+    random: np.random.RandomState
+    block_size: int
+
+    def __init__(self, random: np.random.RandomState, block_size: int = 1024):
+        self.random = random
+        self.block_size = block_size
+        self._values = []
+
+    def __call__(self) -> float:
+        if not self._values:
+            block = (self.random.random_sample(self.block_size) - 0.5) * 1e-6
+            # Reversed so that popping from the end hands them out in the drawn order
+            self._values = block[::-1].tolist()
+        return self._values.pop()
+
 
 class ForceLayoutBase:
+    nodes: List
+    active: Optional[List] = None
+    name: Optional[str] = None
+    dtype: np.dtype = np.dtype(np.float64)
+    storage: ArrayStorage = ArrayStorage()
+    jiggle: Callable[[], float] = staticmethod(jiggle)
+    profiler: Optional[Profiler] = None
+    active_rows: Optional[List[int]] = None
+    _rows: Optional[Dict[int, int]] = None
+
+    # Set by forces whose effect on each node depends only on that node, which then
+    # also implement `accelerate`. Cleared for subclasses which replace `force`
+    # without also replacing `accelerate`, as it would no longer do the same.
+    local: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        overrides = vars(cls)
+        if "accelerate" not in overrides and (
+            "force" in overrides or "__call__" in overrides
+        ):
+            cls.local = False
+
     def force(self, alpha: float, *args, **kwargs):
         raise NotImplementedError()
 
+    def accelerate(
+        self,
+        alpha: float,
+        rows: Union[slice, np.ndarray],
+        x: np.ndarray,
+        y: np.ndarray,
+        vx: np.ndarray,
+        vy: np.ndarray,
+        mobile: np.ndarray,
+    ):
+        """Apply a local force to the nodes at ``rows``, given as arrays of their
+        positions and velocities, updating the velocities of the ``mobile`` ones in
+        place exactly as :meth:`force` would.
+        """
+        raise NotImplementedError()
+
     def __call__(self, *args, **kwargs):
         self.force(*args, **kwargs)
 
     def initialize(self, *args, **kwargs):
         return
 
+    def bind(self, simulation, name: Optional[str] = None):
+        """Adopt the settings shared by all of the forces of ``simulation``"""
+        self.dtype = simulation.dtype
+        self.storage = simulation.storage
+        self.jiggle = simulation.jitter
+        self.profiler = simulation.profiler
+        self._rows = None
+        if name is not None:
+            self.name = name
+
+    def store(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Move ``values`` into this force's :class:`~.ArrayStorage`"""
+        prefix = self.name or self.__class__.__name__
+        return self.storage.store(f"{prefix}.{name}", values)
+
+    def invalidate(self):
+        """Discard anything cached about the node positions, e.g. after moving nodes
+        outside of a tick.
+        """
+        return
+
+    def rows(self) -> Dict[int, int]:
+        """Map the index of each of this force's nodes to its row in the force's
+        per-node arrays.
+        """
+        if self._rows is None:
+            self._rows = {node.index: row for row, node in enumerate(self.nodes)}
+        return self._rows
+
+    def restrict(self, active: Optional[Iterable] = None):
+        """Limit this force to the nodes in ``active``, treating every other node
+        as though it were fixed. Passing :const:`None` lifts the restriction.
+
+        Active nodes which this force does not act on are left out, and the rows of
+        the rest are kept as :attr:`active_rows`.
+        """
+        if active is None:
+            self.active = None
+            self.active_rows = None
+            return
+        rows = self.rows()
+        self.active = []
+        self.active_rows = []
+        for node in active:
+            row = rows.get(node.index)
+            if row is not None:
+                self.active.append(node)
+                self.active_rows.append(row)
+
+    def iter_rows(self, *arrays: np.ndarray) -> Iterator[Tuple]:
+        """Iterate over the active nodes along with their values from each of
+        ``arrays``, reading the arrays one chunk at a time.
+        """
+        if self.active is not None:
+            for node, row in zip(self.active, self.active_rows):
+                yield (node, *[values.item(row) for values in arrays])
+            return
+        for chunk in self.storage.chunks(len(self.nodes)):
+            yield from zip(
+                self.nodes[chunk], *[values[chunk].tolist() for values in arrays]
+            )
+
+
+class _FrozenTreeMixin:
+    """Keeps the nodes of a tree-based force which cannot move this tick in their own
+    :class:`~.QuadTree`, which is only rebuilt when one of those nodes changes.
+
+    Without a restriction these are the static nodes. Under :meth:`restrict` they
+    also include every node outside of the active set, and that tree is kept after
+    the restriction is lifted, so that restricting to the same nodes again reuses it
+    until an unrestricted tick or :meth:`invalidate` may have moved them.
+
+    Subclasses supply :meth:`build_tree`, which builds and summarizes a tree over a
+    list of nodes.
+    """
+
+    frozen: List = []
+    frozen_ids: Optional[FrozenSet[int]] = None
+    frozen_key: Optional[List[Tuple[int, float, float]]] = None
+    frozen_tree: Optional[QuadTree] = None
+    static_key: Optional[List[Tuple[int, float, float]]] = None
+    static_quadtree: Optional[QuadTree] = None
+
+    def build_tree(self, nodes: List) -> Optional[QuadTree]:
+        raise NotImplementedError()
+
+    def restrict(self, active: Optional[Iterable] = None):
+        super().restrict(active)
+        if self.active is None:
+            return
+        ids = frozenset(node.index for node in self.active)
+        if ids != self.frozen_ids:
+            self.frozen_ids = ids
+            self.frozen = [node for node in self.nodes if node.index not in ids]
+            self.frozen_key = None
+            self.frozen_tree = None
+
+    def invalidate(self):
+        self.frozen_key = None
+        self.frozen_tree = None
+        self.static_key = None
+        self.static_quadtree = None
+
+    def partition(self) -> Tuple[List, List]:
+        mobile = []
+        static = []
+        for node in self.nodes if self.active is None else self.active:
+            if is_static(node):
+                static.append(node)
+            else:
+                mobile.append(node)
+        return mobile, static
+
+    def static_tree(self, static: List) -> Optional[QuadTree]:
+        key = [(node.index, node.x, node.y) for node in static]
+        if self.active is None:
+            # Every node may move this tick, including those outside of the last
+            # restriction
+            self.frozen_key = None
+            self.frozen_tree = None
+            if key != self.static_key:
+                self.static_key = key
+                self.static_quadtree = self.build_tree(static)
+            return self.static_quadtree
+        # The nodes outside of the restriction are not checked as they can only move
+        # in an unrestricted tick, which discards the tree
+        if key != self.frozen_key:
+            self.frozen_key = key
+            self.frozen_tree = self.build_tree(self.frozen + static)
+        return self.frozen_tree
+
 
 @dataclass
 class _ConstFn:
@@ -24,21 +237,111 @@ class _ConstFn:
     def __call__(self, *args, **kwargs):
         return self.x
 
+    def evaluate(self, items: Sequence, dtype=float) -> np.ndarray:
+        return np.full(len(items), self.x, dtype=dtype)
+
 
 Constant = _ConstFn
 
 
-def Fn(x: Union[float, Callable[[Any], float]]):
+@dataclass
+class _ArrayFn:
+    """Look up each item's value by its position, or its ``index`` when called
+    without one.
+    """
+
+    values: np.ndarray
+
+    def __call__(self, item, i: Optional[int] = None, *args, **kwargs):
+        if i is None:
+            i = item.index
+        return self.values[i]
+
+    def evaluate(self, items: Sequence, dtype=float) -> np.ndarray:
+        if len(self.values) != len(items):
+            raise ValueError(
+                f"Expected {len(items)} values, but {len(self.values)} were given"
+            )
+        return np.asarray(self.values, dtype=dtype)
+
+
+@dataclass
+class _FieldFn:
+    """Read each item's value from its ``data`` mapping, which must hold it"""
+
+    name: str
+
+    def __call__(self, item, *args, **kwargs):
+        try:
+            data = item.data
+        except AttributeError:
+            raise TypeError(
+                f"Cannot read {self.name!r} from {item!r}, which has no data"
+            ) from None
+        try:
+            return data[self.name]
+        except KeyError:
+            raise KeyError(f"{item!r} has no {self.name!r} in its data") from None
+
+    def evaluate(self, items: Sequence, dtype=float) -> np.ndarray:
+        return np.fromiter(map(self, items), dtype=dtype, count=len(items))
+
+
+@dataclass
+class Vectorized:
+    """Wrap a function computing the values of a whole sequence of items at once.
+
+    Calls for a single item are forwarded as a sequence of one item.
+    """
+
+    fn: Callable[[Sequence], np.ndarray]
+
+    def __call__(self, item, *args, **kwargs):
+        return self.fn([item])[0]
+
+    def evaluate(self, items: Sequence, dtype=float) -> np.ndarray:
+        return np.asarray(self.fn(items), dtype=dtype).reshape(len(items))
+
+
+def Fn(x: Union[float, str, Sequence[float], Callable[[Any], float]]):
+    """Coerce ``x`` into an accessor.
+
+    Callables are used as-is, strings read a field which every item must have from
+    its ``data``, arrays and sequences are looked up by position and anything else is
+    a constant.
+    """
     if callable(x):
         return x
+    if isinstance(x, str):
+        return _FieldFn(x)
+    if isinstance(x, (np.ndarray, list, tuple)):
+        return _ArrayFn(np.asarray(x))
     return _ConstFn(x)
 
 
+def evaluate(
+    fn: Callable, items: Sequence, indexed: bool = False, dtype=float
+) -> np.ndarray:
+    """Evaluate the accessor ``fn`` for all of ``items`` as an array.
+
+    Accessors with an ``evaluate`` method produce the whole array at once. Any other
+    callable is called once per item, as ``fn(item, i, items)`` when ``indexed``
+    or as ``fn(item)`` otherwise.
+    """
+    if hasattr(fn, "evaluate"):
+        return fn.evaluate(items, dtype)
+    if indexed:
+        values = (fn(item, i, items) for i, item in enumerate(items))
+    else:
+        values = map(fn, items)
+    return np.fromiter(values, dtype=dtype, count=len(items))
+
+
 def isnull(x: Optional[float]):
     if x is None:
         return True
     return math.isnan(x)
 
 
-def jiggle() -> float:
-    return (np.random.random() - 0.5) * 1e-6
+def is_static(node) -> bool:
+    return node.fixed or (node.fx is not None and node.fy is not None)
@@ -1,17 +1,17 @@
 import math
 from functools import partial
+from time import perf_counter
 from typing import List, Optional, Callable, Union
 
-import numpy as np
-
 from ..point import VPoint
 from ..quadtree import QuadTree, QuadTreeNode
-from .base import ForceLayoutBase, _ConstFn, jiggle
+from .base import ForceLayoutBase, _ConstFn, _FrozenTreeMixin, Fn, evaluate
 
 
-class CollisionLayout(ForceLayoutBase):
+class CollisionLayout(_FrozenTreeMixin, ForceLayoutBase):
     nodes: List[VPoint]
     radii: List[float]
+    strengths: List[float]
 
     radius: Callable[[VPoint, int, List[VPoint]], float]
     strength: Callable[[VPoint], float]
@@ -21,26 +21,52 @@ class CollisionLayout(ForceLayoutBase):
     ) -> None:
         super().__init__()
         self.nodes = nodes
-        self.radius = radius
-        self.strength = strength
+        self.radius = Fn(radius)
+        self.strength = Fn(strength)
 
     def initialize(self, *args, **kwargs):
-        self.radii = np.zeros(len(self.nodes))
-        for node in self.nodes:
-            self.radii[node.index] = self.radius(node, node.index, self.nodes)
+        self.radii = self.store(
+            "radii", evaluate(self.radius, self.nodes, indexed=True, dtype=self.dtype)
+        )
+        self.strengths = self.store(
+            "strengths", evaluate(self.strength, self.nodes, dtype=self.dtype)
+        )
+        self.invalidate()
 
-    def force(self, *args, **kwargs):
-        tree = QuadTree.from_points(self.nodes)
+    def build_tree(self, nodes: List[VPoint]) -> Optional[QuadTree]:
+        if not nodes:
+            return None
+        tree = QuadTree.from_points(nodes)
         tree.visit_after(self.prepare)
-        for node in self.nodes:
-            ri = self.radii[node.index]
+        return tree
+
+    def force(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
+        mobile, static = self.partition()
+        tree = self.build_tree(mobile)
+        static_tree = self.static_tree(static)
+        apply = self.apply
+        if profiler is not None:
+            profiler.add(self.name, "build", perf_counter() - start)
+            apply = profiler.counting(self.name, "visits", apply)
+            start = perf_counter()
+        for node in mobile:
+            ri = self.radii.item(node.index)
             xi = node.x + node.vx
             yi = node.y + node.vy
-            tree.visit(partial(self.apply, node, xi, yi, ri))
+            tree.visit(partial(apply, node, xi, yi, ri))
+            if static_tree is not None:
+                # Nodes in the static tree are never visited themselves, so each pair
+                # is resolved from the mobile side only and only moves the mobile node.
+                static_tree.visit(partial(apply, node, xi, yi, ri, mutual=False))
+        if profiler is not None:
+            profiler.add(self.name, "traverse", perf_counter() - start)
 
     def radius_of(self, x):
         if isinstance(x, VPoint):
-            return self.radii[x.index]
+            return self.radii.item(x.index)
         elif isinstance(x, QuadTreeNode):
             return x.data.get("radius")
         else:
@@ -66,14 +92,15 @@ class CollisionLayout(ForceLayoutBase):
         y0: float,
         x1: float,
         y1: float,
+        mutual: bool = True,
     ):
         rj = self.radius_of(quad)
         r = rj + ri
         if isinstance(quad, QuadTreeNode) and quad.is_leaf():
             for pt in quad.points:
-                self.apply(node, xi, yi, ri, pt, x0, y0, x1, y1)
+                self.apply(node, xi, yi, ri, pt, x0, y0, x1, y1, mutual)
         if isinstance(quad, VPoint):
-            if quad.index > node.index:
+            if quad.index > node.index or not mutual:
                 x = xi - quad.x - quad.vx
                 y = yi - quad.y - quad.vy
                 li = x**2 + y**2
@@ -83,13 +110,13 @@ class CollisionLayout(ForceLayoutBase):
                     # if not rad_hit and ov_hit:
                     #     print(f"Overlap Hit {node} & {quad}")
                     if x == 0:
-                        x = jiggle()
+                        x = self.jiggle()
                         li += x**2
                     if y == 0:
-                        y = jiggle()
+                        y = self.jiggle()
                         li += y**2
                     li = math.sqrt(li)
-                    li = (r - li) / li * self.strength(node)
+                    li = (r - li) / li * self.strengths.item(node.index)
                     x *= li
                     y *= li
                     rj *= rj
@@ -98,7 +125,7 @@ class CollisionLayout(ForceLayoutBase):
                         node.vx += x * r
                         node.vy += y * r
                     r = 1 - r
-                    if not quad.fixed:
+                    if mutual and not quad.fixed:
                         quad.vx -= x * r
                         quad.vy -= y * r
                 return
@@ -1,11 +1,23 @@
+from collections import defaultdict
 from dataclasses import dataclass
 import math
-from typing import List, Callable, Dict
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    Callable,
+    Dict,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 import numpy as np
 
 from ..point import VPoint
-from .base import ForceLayoutBase, _ConstFn, jiggle, Fn
+from .base import ForceLayoutBase, _ConstFn, Fn, evaluate
 
 
 @dataclass
@@ -20,10 +32,47 @@ class VLinkage:
         )
 
 
+class LinkArray(Sequence[VLinkage]):
+    """Links given as arrays of the positions of their source and target nodes in
+    ``nodes``, which only creates a :class:`VLinkage` for a link when it is accessed.
+    """
+
+    nodes: List[VPoint]
+    sources: np.ndarray
+    targets: np.ndarray
+
+    def __init__(self, nodes: List[VPoint], sources: np.ndarray, targets: np.ndarray):
+        self.nodes = nodes
+        self.sources = np.asarray(sources, dtype=np.intp).reshape(-1)
+        self.targets = np.asarray(targets, dtype=np.intp).reshape(-1)
+        if len(self.sources) != len(self.targets):
+            raise ValueError(
+                f"Got {len(self.sources)} sources but {len(self.targets)} targets"
+            )
+        n = len(nodes)
+        for ends in (self.sources, self.targets):
+            if len(ends) and (ends.min() < 0 or ends.max() >= n):
+                raise IndexError(f"Link endpoints must be between 0 and {n - 1}")
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(<{len(self)} links>)"
+
+    def __getitem__(self, i: Union[int, slice]):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        i = range(len(self))[i]
+        return VLinkage(
+            self.nodes[self.sources[i]], self.nodes[self.targets[i]], index=i
+        )
+
+
 class LinkageForceDirectedLayout(ForceLayoutBase):
 
     nodes: List[VPoint]
-    links: List[VLinkage]
+    links: Union[List[VLinkage], LinkArray]
 
     strengths: List[float]
     count: List[float]
@@ -31,11 +80,18 @@ class LinkageForceDirectedLayout(ForceLayoutBase):
     distances: List[float]
     bias: List[float]
 
+    sources: np.ndarray
+    targets: np.ndarray
+
     strength: Callable[[VLinkage], float]
     identity: Callable[[VPoint], int]
     distance: Callable[[VPoint], float]
     node_by_id: Dict[int, VPoint]
 
+    active_ids: Optional[Set[int]] = None
+    active_links: Optional[List[int]] = None
+    _adjacency: Optional[Dict[int, List[int]]] = None
+
     def __init__(
         self,
         nodes,
@@ -50,65 +106,127 @@ class LinkageForceDirectedLayout(ForceLayoutBase):
         self.links = links
         self.identity = identity
         self.distance = Fn(distance)
-        self.strength = strength
+        self.strength = Fn(strength)
 
     #         self.initialize()
 
     def initialize(self, *args, **kwargs):
+        self._adjacency = None
         if not self.nodes:
+            empty = np.zeros(0, dtype=self.dtype)
+            self.sources = self.targets = np.zeros(0, dtype=np.intp)
+            self.count = self.distances = self.strengths = self.bias = empty
             return
         n = len(self.nodes)
         m = len(self.links)
-        self.node_by_id = {self.identity(node): node for node in self.nodes}
-        self.count = np.zeros(n)
-
-        for i, link in enumerate(self.links):
-            link.index = i
-            if not isinstance(link.target, (VPoint)):
-                link.target = self.node_by_id[link.target]
-            if not isinstance(link.source, (VPoint)):
-                link.source = self.node_by_id[link.source]
-            self.count[link.source.index] += 1
-            self.count[link.target.index] += 1
-
-        self.bias = np.zeros(m)
-        for i, link in enumerate(self.links):
-            self.bias[i] = self.count[link.source.index] / (
-                self.count[link.source.index] + self.count[link.target.index]
+
+        if isinstance(self.links, LinkArray):
+            sources = self.links.sources
+            targets = self.links.targets
+        else:
+            self.node_by_id = {self.identity(node): node for node in self.nodes}
+            for i, link in enumerate(self.links):
+                link.index = i
+                if not isinstance(link.target, (VPoint)):
+                    link.target = self.node_by_id[link.target]
+                if not isinstance(link.source, (VPoint)):
+                    link.source = self.node_by_id[link.source]
+
+            sources = np.fromiter(
+                (link.source.index for link in self.links), dtype=np.intp, count=m
+            )
+            targets = np.fromiter(
+                (link.target.index for link in self.links), dtype=np.intp, count=m
             )
+        count = np.bincount(sources, minlength=n) + np.bincount(targets, minlength=n)
+        count = count.astype(self.dtype)
+        source_count = count[sources]
+        bias = source_count / (source_count + count[targets])
 
-        self.strengths = np.zeros(m)
-        self.distances = np.zeros(m)
+        self.sources = self.store("sources", sources)
+        self.targets = self.store("targets", targets)
+        self.count = self.store("count", count)
+        self.bias = self.store("bias", bias)
 
         self.init_strengths()
         self.init_distances()
 
     def init_strengths(self):
-        for i, link in enumerate(self.links):
-            self.strengths[i] = self.strength(link)
+        if self.strength == self.default_strength:
+            strengths = 1 / np.minimum(
+                self.count[self.sources], self.count[self.targets]
+            )
+        else:
+            strengths = evaluate(self.strength, self.links, dtype=self.dtype)
+        self.strengths = self.store("strengths", strengths)
 
     def init_distances(self):
-        for i, link in enumerate(self.links):
-            self.distances[i] = self.distance(link)
+        self.distances = self.store(
+            "distances", evaluate(self.distance, self.links, dtype=self.dtype)
+        )
 
     def default_strength(self, link):
         return 1 / min(self.count[link.source.index], self.count[link.target.index])
 
+    def adjacency(self) -> Dict[int, List[int]]:
+        if self._adjacency is None:
+            adjacency = defaultdict(list)
+            ends = zip(self.sources.tolist(), self.targets.tolist())
+            for i, (s, t) in enumerate(ends):
+                adjacency[s].append(i)
+                adjacency[t].append(i)
+            self._adjacency = adjacency
+        return self._adjacency
+
+    def neighbors(self, node: VPoint) -> Iterator[VPoint]:
+        for i in self.adjacency().get(node.index, ()):
+            s = int(self.sources[i])
+            yield self.nodes[int(self.targets[i]) if s == node.index else s]
+
+    def restrict(self, active: Optional[Iterable[VPoint]] = None):
+        super().restrict(active)
+        self.active_ids = None
+        self.active_links = None
+        if self.active is not None:
+            self.active_ids = {node.index for node in self.active}
+            adjacency = self.adjacency()
+            self.active_links = sorted(
+                {i for j in self.active_ids for i in adjacency.get(j, ())}
+            )
+
+    def iter_links(self) -> Iterator[Tuple[int, int, float, float, float]]:
+        """Iterate over the source, target, distance, strength and bias of each active
+        link, reading them one chunk at a time.
+        """
+        columns = (
+            self.sources,
+            self.targets,
+            self.distances,
+            self.strengths,
+            self.bias,
+        )
+        if self.active_links is not None:
+            yield from zip(*[values[self.active_links].tolist() for values in columns])
+            return
+        for chunk in self.storage.chunks(len(self.links)):
+            yield from zip(*[values[chunk].tolist() for values in columns])
+
     def force(self, alpha: float):
-        for i, link in enumerate(self.links):
-            source = link.source
-            target = link.target
-            x = (target.x + target.vx - source.x - source.vx) or jiggle()
-            y = (target.y + target.vy - source.y - source.vy) or jiggle()
+        nodes = self.nodes
+        active_ids = self.active_ids
+        for s, t, distance, strength, b in self.iter_links():
+            source = nodes[s]
+            target = nodes[t]
+            x = (target.x + target.vx - source.x - source.vx) or self.jiggle()
+            y = (target.y + target.vy - source.y - source.vy) or self.jiggle()
             force = math.sqrt(x**2 + y**2)
-            force = (force - self.distances[i]) / force * alpha * self.strengths[i]
+            force = (force - distance) / force * alpha * strength
             x *= force
             y *= force
-            b = self.bias[i]
-            if not target.fixed:
+            if not target.fixed and (active_ids is None or target.index in active_ids):
                 target.vx -= x * b
                 target.vy -= y * b
             b = 1 - b
-            if not source.fixed:
+            if not source.fixed and (active_ids is None or source.index in active_ids):
                 source.vx += x * b
                 source.vy += y * b
@@ -1,14 +1,13 @@
 import math
+from time import perf_counter
 from typing import List, Optional, Callable
 
-import numpy as np
-
 from ..point import VPoint
 from ..quadtree import QuadTree, QuadTreeNode
-from .base import ForceLayoutBase, _ConstFn, jiggle
+from .base import ForceLayoutBase, _ConstFn, _FrozenTreeMixin, Fn, evaluate
 
 
-class ManyBodyForcesLayout(ForceLayoutBase):
+class ManyBodyForcesLayout(_FrozenTreeMixin, ForceLayoutBase):
     nodes: List[VPoint]
     strengths: List[float]
 
@@ -21,29 +20,46 @@ class ManyBodyForcesLayout(ForceLayoutBase):
     strength: Callable[[VPoint], float]
 
     def __init__(self, nodes, strength=_ConstFn(-30)):
-        if not callable(strength):
-            strength = _ConstFn(strength)
         self.nodes = nodes
-        self.strength = strength
+        self.strength = Fn(strength)
         self.initialize()
 
     def initialize(self, *args, **kwargs):
-        self.strengths = np.zeros(len(self.nodes))
-        for i, node in enumerate(self.nodes):
-            self.strengths[i] = self.strength(node)
+        self.strengths = self.store(
+            "strengths", evaluate(self.strength, self.nodes, dtype=self.dtype)
+        )
+        self.invalidate()
 
-    def force(self, alpha: float, *args, **kwargs):
-        tree: QuadTree = QuadTree.from_points(self.nodes)
+    def build_tree(self, nodes: List[VPoint]) -> Optional[QuadTree]:
+        if not nodes:
+            return None
+        tree: QuadTree = QuadTree.from_points(nodes)
         tree.visit_after(self.accumulate)
+        return tree
+
+    def force(self, alpha: float, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
+        mobile, static = self.partition()
+        tree = self.build_tree(mobile)
+        static_tree = self.static_tree(static)
         self.alpha = alpha
-        for node in self.nodes:
-            if node.fixed:
-                continue
+        apply = self.apply
+        if profiler is not None:
+            profiler.add(self.name, "build", perf_counter() - start)
+            apply = profiler.counting(self.name, "visits", apply)
+            start = perf_counter()
+        for node in mobile:
             self.current_node = node
             # pre = (node.vx, node.vy)
-            tree.visit(self.apply)
+            tree.visit(apply)
+            if static_tree is not None:
+                static_tree.visit(apply)
             # post = (node.vx, node.vy)
             # print(f"{node.index}, {pre[1]:0.2f} -> {post[1]:0.2f}")
+        if profiler is not None:
+            profiler.add(self.name, "traverse", perf_counter() - start)
 
     def accumulate(self, quad: QuadTreeNode, *args, **kwargs):
         strength = 0
@@ -64,7 +80,7 @@ class ManyBodyForcesLayout(ForceLayoutBase):
         # For leafe nodes, accumulate forces from coincident quadrants
         else:
             for q in quad.points:
-                strength += self.strengths[q.index]
+                strength += self.strengths.item(q.index)
             # don't have a concept of "next" q
         quad.value = strength
         return False
@@ -83,10 +99,10 @@ class ManyBodyForcesLayout(ForceLayoutBase):
         if w**2 / self.theta2 < force:
             if force < self.distance_max2:
                 if x == 0:
-                    x = jiggle()
+                    x = self.jiggle()
                     force += x**2
                 if y == 0:
-                    y += jiggle()
+                    y += self.jiggle()
                     force += y**2
                 if force < self.distance_min2:
                     force = math.sqrt(self.distance_min2 * force)
@@ -104,13 +120,13 @@ class ManyBodyForcesLayout(ForceLayoutBase):
         if quad is not self.current_node:
             for point in quad.points:
                 if x == 0:
-                    x = jiggle()
+                    x = self.jiggle()
                     force += x**2
                 if y == 0:
-                    y += jiggle()
+                    y += self.jiggle()
                     force += y**2
                 if force < self.distance_min2:
                     force = math.sqrt(self.distance_min2 * force)
-                w = self.strengths[point.index] * self.alpha / force
+                w = self.strengths.item(point.index) * self.alpha / force
                 self.current_node.vx += x * w
                 self.current_node.vy += y * w
@@ -4,7 +4,7 @@ from typing import List, Callable
 import numpy as np
 
 from ..point import VPoint
-from .base import ForceLayoutBase, isnull, Fn
+from .base import ForceLayoutBase, Fn, evaluate
 
 
 class XForceLayout(ForceLayoutBase):
@@ -14,27 +14,31 @@ class XForceLayout(ForceLayoutBase):
     strengths: List[float]
     xz: List[float]
 
+    local = True
+
     def __init__(self, nodes: List[VPoint], x=Fn(0.0), strength=Fn(0.1)):
         x = Fn(x)
         self.nodes = nodes
-        self.strength = strength
+        self.strength = Fn(strength)
         self.x = x
         self.initialize()
 
     def initialize(self, *args, **kwargs):
-        self.xz = np.zeros(len(self.nodes))
-        self.strengths = np.zeros(len(self.nodes))
-        for i, node in enumerate(self.nodes):
-            self.xz[i] = self.x(node, i, self.nodes)
-            self.strengths[i] = (
-                0 if isnull(self.xz[i]) else self.strength(node, i, self.nodes)
-            )
+        xz = evaluate(self.x, self.nodes, indexed=True, dtype=self.dtype)
+        strengths = evaluate(self.strength, self.nodes, indexed=True, dtype=self.dtype)
+        strengths[np.isnan(xz)] = 0
+        self.xz = self.store("xz", xz)
+        self.strengths = self.store("strengths", strengths)
 
     def force(self, alpha: float):
-        for i, node in enumerate(self.nodes):
+        for node, xz, strength in self.iter_rows(self.xz, self.strengths):
             if node.fixed:
                 continue
-            node.vx += (self.xz[i] - node.x) * self.strengths[i] * alpha
+            node.vx += (xz - node.x) * strength * alpha
+
+    def accelerate(self, alpha, rows, x, y, vx, vy, mobile):
+        dv = (self.xz[rows] - x) * self.strengths[rows] * alpha
+        vx[mobile] += dv[mobile]
 
     def __call__(self, alpha: float):
         self.force(alpha)
@@ -47,27 +51,31 @@ class YForceLayout(ForceLayoutBase):
     strengths: List[float]
     yz: List[float]
 
+    local = True
+
     def __init__(self, nodes: List[VPoint], y=Fn(0.0), strength=Fn(0.1)):
         y = Fn(y)
         self.nodes = nodes
-        self.strength = strength
+        self.strength = Fn(strength)
         self.y = y
         self.initialize()
 
     def initialize(self, *args, **kwargs):
-        self.yz = np.zeros(len(self.nodes))
-        self.strengths = np.zeros(len(self.nodes))
-        for i, node in enumerate(self.nodes):
-            self.yz[i] = self.y(node, i, self.nodes)
-            self.strengths[i] = (
-                0 if isnull(self.yz[i]) else self.strength(node, i, self.nodes)
-            )
+        yz = evaluate(self.y, self.nodes, indexed=True, dtype=self.dtype)
+        strengths = evaluate(self.strength, self.nodes, indexed=True, dtype=self.dtype)
+        strengths[np.isnan(yz)] = 0
+        self.yz = self.store("yz", yz)
+        self.strengths = self.store("strengths", strengths)
 
     def force(self, alpha: float):
-        for i, node in enumerate(self.nodes):
+        for node, yz, strength in self.iter_rows(self.yz, self.strengths):
             if node.fixed:
                 continue
-            node.vy += (self.yz[i] - node.y) * self.strengths[i] * alpha
+            node.vy += (yz - node.y) * strength * alpha
+
+    def accelerate(self, alpha, rows, x, y, vx, vy, mobile):
+        dv = (self.yz[rows] - y) * self.strengths[rows] * alpha
+        vy[mobile] += dv[mobile]
 
     def __call__(self, alpha: float):
         self.force(alpha)
@@ -84,6 +92,8 @@ class RadialForceDirectedLayout(ForceLayoutBase):
     x: float = 0.0
     y: float = 0.0
 
+    local = True
+
     def __init__(
         self,
         nodes: List[VPoint],
@@ -93,30 +103,39 @@ class RadialForceDirectedLayout(ForceLayoutBase):
         radius=Fn(1.0),
     ):
         self.nodes = nodes
-        self.strength = strength
-        self.radius = radius
+        self.strength = Fn(strength)
+        self.radius = Fn(radius)
         self.x = x
         self.y = y
         self.initialize()
 
     def initialize(self, *args, **kwargs):
-        self.radii = [
-            self.radius(node, i, self.nodes) for i, node in enumerate(self.nodes)
-        ]
-        self.strengths = [
-            self.strength(node, i, self.nodes) for i, node in enumerate(self.nodes)
-        ]
+        radii = evaluate(self.radius, self.nodes, indexed=True, dtype=self.dtype)
+        strengths = evaluate(self.strength, self.nodes, indexed=True, dtype=self.dtype)
+        self.radii = self.store("radii", radii)
+        self.strengths = self.store("strengths", strengths)
 
     def force(self, alpha: float):
-        for i, node in enumerate(self.nodes):
+        for node, radius, strength in self.iter_rows(self.radii, self.strengths):
             if node.fixed:
                 continue
             dx = node.x - (self.x or 1e-6)
             dy = node.y - (self.y or 1e-6)
-            r = math.sqrt(dx**2 + dy**2)
-            k = (self.radii[i] - r) * self.strengths[i] * alpha / r
+            # Squared by multiplying, which unlike `**` rounds the same for arrays
+            r = math.sqrt(dx * dx + dy * dy)
+            k = (radius - r) * strength * alpha / r
             node.vx += dx * k
             node.vy += dy * k
 
+    def accelerate(self, alpha, rows, x, y, vx, vy, mobile):
+        x = x[mobile]
+        y = y[mobile]
+        dx = x - (self.x or 1e-6)
+        dy = y - (self.y or 1e-6)
+        r = np.sqrt(dx * dx + dy * dy)
+        k = (self.radii[rows][mobile] - r) * self.strengths[rows][mobile] * alpha / r
+        vx[mobile] += dx * k
+        vy[mobile] += dy * k
+
     def __call__(self, alpha: float):
         self.force(alpha)
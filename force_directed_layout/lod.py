@@ -0,0 +1,251 @@
+import heapq
+import os
+
+from typing import List, NamedTuple, Sequence, Tuple
+
+import numpy as np
+
+from .point import VPoint
+from .quadtree import QuadTree, QuadTreeNode
+
+
+class LevelOfDetail(NamedTuple):
+    """The items selected for a viewport, where each item is either a single node
+    (``count == 1``) or a whole cell summarized by its centroid. ``node`` holds the
+    node itself or the cell's representative node.
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    count: np.ndarray
+    node: np.ndarray
+
+    def __len__(self):
+        return len(self.node)
+
+
+class LevelOfDetailIndex:
+    """A read-only summary of a finished layout for serving zoomable views.
+
+    Every cell of a :class:`~.QuadTree` over the layout is flattened into arrays
+    holding its bounds, its children, the number of nodes under it, their centroid and
+    a representative node, so that :meth:`query` can pick the coarsest set of cells
+    and nodes covering a viewport within a point budget. The arrays can be written out
+    with :meth:`save` and memory-mapped back with :meth:`load`.
+    """
+
+    _fields = (
+        "bounds",
+        "children",
+        "start",
+        "own",
+        "count",
+        "centroid",
+        "representative",
+        "order",
+        "positions",
+    )
+
+    bounds: np.ndarray
+    children: np.ndarray
+    start: np.ndarray
+    own: np.ndarray
+    count: np.ndarray
+    centroid: np.ndarray
+    representative: np.ndarray
+    order: np.ndarray
+    positions: np.ndarray
+
+    def __init__(
+        self,
+        bounds: np.ndarray,
+        children: np.ndarray,
+        start: np.ndarray,
+        own: np.ndarray,
+        count: np.ndarray,
+        centroid: np.ndarray,
+        representative: np.ndarray,
+        order: np.ndarray,
+        positions: np.ndarray,
+    ):
+        self.bounds = bounds
+        self.children = children
+        self.start = start
+        self.own = own
+        self.count = count
+        self.centroid = centroid
+        self.representative = representative
+        self.order = order
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(<{len(self.count)} cells>, <{len(self)} nodes>)"
+        )
+
+    @classmethod
+    def from_tree(cls, tree: QuadTree, dtype=float) -> "LevelOfDetailIndex":
+        """Flatten ``tree``, whose points must have an ``index`` attribute, storing
+        coordinates as ``dtype``.
+        """
+        cells: List[QuadTreeNode] = []
+        parents: List[int] = []
+        starts: List[int] = []
+        points = []
+
+        stack = [(tree.root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            cells.append(node)
+            parents.append(parent)
+            starts.append(len(points))
+            points.extend(node.points)
+            i = len(cells) - 1
+            for child in reversed(node.children):
+                if child is not None:
+                    stack.append((child, i))
+
+        n_cells = len(cells)
+        bounds = np.array(
+            [(c.x, c.y, c.width, c.height) for c in cells], dtype=dtype
+        ).reshape((-1, 4))
+        children = np.full((n_cells, 4), -1, dtype=np.intp)
+        n_children = np.zeros(n_cells, dtype=np.intp)
+        for i, parent in enumerate(parents):
+            if parent >= 0:
+                children[parent, n_children[parent]] = i
+                n_children[parent] += 1
+
+        order = np.fromiter((p.index for p in points), dtype=np.intp, count=len(points))
+        positions = np.array([(p.x, p.y) for p in points], dtype=dtype).reshape((-1, 2))
+        start = np.array(starts, dtype=np.intp)
+
+        # Cells are in preorder, so every subtree covers a contiguous run of `order`
+        # and children always come after their parents.
+        own = np.array([len(c.points) for c in cells], dtype=np.intp)
+        count = own.copy()
+        for i in range(n_cells - 1, 0, -1):
+            count[parents[i]] += count[i]
+
+        # The running totals are kept at full precision even when `dtype` is not
+        totals = np.zeros((len(points) + 1, 2), dtype=float)
+        np.cumsum(positions, axis=0, out=totals[1:])
+        stop = start + count
+        with np.errstate(invalid="ignore", divide="ignore"):
+            centroid = ((totals[stop] - totals[start]) / count[:, None]).astype(dtype)
+
+        # Leaves are represented by their node closest to the centroid and everything
+        # else by the closest of its children's representatives.
+        representative = np.full(n_cells, -1, dtype=np.intp)
+        rep_position = [0] * n_cells
+        xs = positions[:, 0].tolist()
+        ys = positions[:, 1].tolist()
+        child_lists = children.tolist()
+        count_list = count.tolist()
+        for i, (cx, cy) in zip(range(n_cells - 1, -1, -1), centroid[::-1].tolist()):
+            if not count_list[i]:
+                continue
+            candidates = list(range(starts[i], starts[i] + len(cells[i].points)))
+            candidates.extend(
+                rep_position[j] for j in child_lists[i] if j >= 0 and count_list[j]
+            )
+            rep_position[i] = min(
+                candidates, key=lambda k: (xs[k] - cx) ** 2 + (ys[k] - cy) ** 2
+            )
+        representative[:] = order[rep_position]
+        representative[count == 0] = -1
+
+        return cls(
+            bounds,
+            children,
+            start,
+            own,
+            count,
+            centroid,
+            representative,
+            order,
+            positions,
+        )
+
+    @classmethod
+    def from_points(cls, points: Sequence[VPoint], dtype=float) -> "LevelOfDetailIndex":
+        return cls.from_tree(QuadTree.from_points(points), dtype=dtype)
+
+    @classmethod
+    def from_positions(cls, xy: np.ndarray, dtype=float) -> "LevelOfDetailIndex":
+        xy = np.asarray(xy, dtype=float).reshape((-1, 2))
+        return cls.from_points(VPoint.from_arrays(xy[:, 0], xy[:, 1]), dtype=dtype)
+
+    def _visible(self, i: int, x: float, y: float, x_end: float, y_end: float):
+        cx, cy, cw, ch = self.bounds[i].tolist()
+        return cx < x_end and x < cx + cw and cy < y_end and y < cy + ch
+
+    def query(
+        self, viewport: Tuple[float, float, float, float], max_points: int
+    ) -> LevelOfDetail:
+        """Select at most ``max_points`` items covering the ``(x, y, width, height)``
+        viewport, splitting the most populous cells first.
+        """
+        x, y, width, height = viewport
+        x_end = x + width
+        y_end = y + height
+        heap = []
+        if max_points > 0 and len(self.count) and self.count[0]:
+            if self._visible(0, x, y, x_end, y_end):
+                heap.append((-int(self.count[0]), 0))
+        nodes = []
+        final = set()
+        n_items = len(heap)
+        while heap:
+            _, i = heapq.heappop(heap)
+            kids = [
+                j
+                for j in self.children[i].tolist()
+                if j >= 0 and self.count[j] and self._visible(j, x, y, x_end, y_end)
+            ]
+            # Nodes held by the cell itself rather than a child are split out
+            # individually and kept only if they are within the viewport themselves
+            start = int(self.start[i])
+            own = np.arange(start, start + int(self.own[i]))
+            if len(own):
+                xs = self.positions[own, 0]
+                ys = self.positions[own, 1]
+                own = own[(x <= xs) & (xs < x_end) & (y <= ys) & (ys < y_end)]
+            if n_items - 1 + len(kids) + len(own) > max_points:
+                final.add(i)
+                continue
+            n_items += len(kids) + len(own) - 1
+            nodes.extend(own.tolist())
+            for j in kids:
+                heapq.heappush(heap, (-int(self.count[j]), j))
+        cells = sorted(final)
+        nodes = np.array(nodes, dtype=np.intp)
+        cells = np.array(cells, dtype=np.intp)
+        return LevelOfDetail(
+            np.concatenate([self.centroid[cells, 0], self.positions[nodes, 0]]),
+            np.concatenate([self.centroid[cells, 1], self.positions[nodes, 1]]),
+            np.concatenate([self.count[cells], np.ones(len(nodes), dtype=np.intp)]),
+            np.concatenate([self.representative[cells], self.order[nodes]]),
+        )
+
+    def save(self, path: os.PathLike):
+        """Write each array to ``path`` as a separate ``.npy`` file"""
+        os.makedirs(path, exist_ok=True)
+        for name in self._fields:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path: os.PathLike, mmap: bool = True) -> "LevelOfDetailIndex":
+        """Read an index written by :meth:`save`, memory-mapping the arrays unless
+        ``mmap`` is :const:`False`.
+        """
+        mode = "r" if mmap else None
+        return cls(
+            **{
+                name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mode)
+                for name in cls._fields
+            }
+        )
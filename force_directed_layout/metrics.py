@@ -0,0 +1,290 @@
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .layouts.collide import CollisionLayout
+from .layouts.linkage import LinkageForceDirectedLayout
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + count)`` for each start and count"""
+    offsets = np.cumsum(counts) - counts
+    return np.repeat(starts - offsets, counts) + np.arange(int(counts.sum()))
+
+
+def _adjacency(
+    n: int, sources: np.ndarray, targets: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    ends = np.concatenate([sources, targets])
+    others = np.concatenate([targets, sources])
+    neighbors = others[np.argsort(ends, kind="stable")]
+    offsets = np.zeros(n + 1, dtype=np.intp)
+    np.cumsum(np.bincount(ends, minlength=n), out=offsets[1:])
+    return offsets, neighbors
+
+
+def _hops(offsets: np.ndarray, neighbors: np.ndarray, origin: int) -> np.ndarray:
+    row = np.full(len(offsets) - 1, np.inf)
+    row[origin] = 0
+    frontier = np.array([origin], dtype=np.intp)
+    hops = 0
+    while len(frontier):
+        hops += 1
+        starts = offsets[frontier]
+        found = neighbors[_ranges(starts, offsets[frontier + 1] - starts)]
+        frontier = np.unique(found[np.isinf(row[found])])
+        row[frontier] = hops
+    return row
+
+
+def graph_distances(
+    n: int, sources: np.ndarray, targets: np.ndarray, origins: Sequence[int]
+) -> np.ndarray:
+    """Count the links on the shortest path from each of ``origins`` to every node,
+    as a ``(len(origins), n)`` array holding ``inf`` where there is no path.
+    """
+    offsets, neighbors = _adjacency(n, sources, targets)
+    out = np.empty((len(origins), n))
+    for row, origin in enumerate(origins):
+        out[row] = _hops(offsets, neighbors, origin)
+    return out
+
+
+def stress(
+    xy: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    distance: Union[float, np.ndarray] = 30.0,
+    samples: int = 100,
+    seed: int = 0,
+) -> float:
+    """Estimate the mean squared relative error between layout distances and graph
+    distances over the pairs from ``samples`` random nodes to every node they are
+    connected to.
+
+    Graph distances count links, each ``distance`` long, or the mean of ``distance``
+    if it is given per link.
+    """
+    xy = np.asarray(xy, dtype=float).reshape((-1, 2))
+    n = len(xy)
+    if not n:
+        return 0.0
+    unit = float(np.mean(distance)) if np.size(distance) else 1.0
+    random = np.random.RandomState(seed)
+    offsets, neighbors = _adjacency(n, sources, targets)
+    total = 0.0
+    count = 0
+    for origin in random.choice(n, min(samples, n), replace=False).tolist():
+        hops = _hops(offsets, neighbors, origin)
+        lengths = np.sqrt(((xy - xy[origin]) ** 2).sum(axis=1))
+        valid = np.isfinite(hops) & (hops > 0) & np.isfinite(lengths)
+        expected = hops[valid] * unit
+        total += float((((lengths[valid] - expected) / expected) ** 2).sum())
+        count += int(valid.sum())
+    return total / count if count else 0.0
+
+
+def edge_length_deviation(
+    xy: np.ndarray,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    distances: Union[float, np.ndarray],
+) -> np.ndarray:
+    """The relative difference between each link's length and its target distance"""
+    xy = np.asarray(xy, dtype=float).reshape((-1, 2))
+    lengths = np.sqrt(((xy[sources] - xy[targets]) ** 2).sum(axis=1))
+    distances = np.asarray(distances, dtype=float)
+    return (lengths - distances) / distances
+
+
+def _box_pairs(boxes: np.ndarray, block: int = 2**20) -> Iterator[np.ndarray]:
+    """Sweep a line across ``(xmin, ymin, xmax, ymax)`` boxes in order of ``xmin``,
+    yielding ``(2, k)`` arrays of the pairs whose boxes touch, about ``block`` candidate
+    pairs at a time.
+    """
+    n = len(boxes)
+    order = np.argsort(boxes[:, 0], kind="stable")
+    sorted_boxes = boxes[order]
+    # The boxes that start while box i is still open are exactly i + 1 up to `stop`
+    stop = np.searchsorted(sorted_boxes[:, 0], sorted_boxes[:, 2], side="right")
+    counts = np.maximum(stop - np.arange(n) - 1, 0)
+    totals = np.cumsum(counts)
+    start = 0
+    while start < n:
+        done = totals[start - 1] if start else 0
+        end = max(int(np.searchsorted(totals, done + block, side="right")), start + 1)
+        rows = np.arange(start, end)
+        i = np.repeat(rows, counts[rows])
+        j = _ranges(rows + 1, counts[rows])
+        keep = (sorted_boxes[j, 1] <= sorted_boxes[i, 3]) & (
+            sorted_boxes[i, 1] <= sorted_boxes[j, 3]
+        )
+        yield np.stack([order[i[keep]], order[j[keep]]])
+        start = end
+
+
+def overlapping_pairs(
+    xy: np.ndarray,
+    radii: Optional[Union[float, np.ndarray]] = None,
+    boxes: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Find the pairs of nodes whose circles of ``radii`` or whose ``(xmin, ymin,
+    xmax, ymax)`` ``boxes`` overlap, as a ``(2, k)`` array. Rows of ``boxes`` holding
+    ``nan`` are ignored, as are nodes at a position which is not finite.
+    """
+    xy = np.asarray(xy, dtype=float).reshape((-1, 2))
+    n = len(xy)
+    if radii is None:
+        radii = np.zeros(n)
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (n,))
+    outer = np.concatenate([xy - radii[:, None], xy + radii[:, None]], axis=1)
+    if boxes is not None:
+        boxes = np.asarray(boxes, dtype=float).reshape((-1, 4))
+        has_box = np.isfinite(boxes).all(axis=1)
+        outer[has_box, :2] = np.minimum(outer[has_box, :2], boxes[has_box, :2])
+        outer[has_box, 2:] = np.maximum(outer[has_box, 2:], boxes[has_box, 2:])
+    valid = np.flatnonzero(np.isfinite(outer).all(axis=1))
+
+    found = []
+    for i, j in _box_pairs(outer[valid]):
+        i = valid[i]
+        j = valid[j]
+        hit = ((xy[i] - xy[j]) ** 2).sum(axis=1) < (radii[i] + radii[j]) ** 2
+        if boxes is not None:
+            bi = boxes[i]
+            bj = boxes[j]
+            hit |= (
+                (bi[:, 0] < bj[:, 2])
+                & (bj[:, 0] < bi[:, 2])
+                & (bi[:, 1] < bj[:, 3])
+                & (bj[:, 1] < bi[:, 3])
+            )
+        found.append(np.stack([i[hit], j[hit]]))
+    if not found:
+        return np.zeros((2, 0), dtype=np.intp)
+    return np.concatenate(found, axis=1)
+
+
+def overlaps(
+    xy: np.ndarray,
+    radii: Optional[Union[float, np.ndarray]] = None,
+    boxes: Optional[np.ndarray] = None,
+) -> int:
+    """Count the pairs of nodes found by :func:`overlapping_pairs`"""
+    return overlapping_pairs(xy, radii, boxes).shape[1]
+
+
+def _orientation(ax, ay, bx, by, cx, cy) -> np.ndarray:
+    return np.sign((bx - ax) * (cy - ay) - (by - ay) * (cx - ax))
+
+
+def crossing_pairs(
+    xy: np.ndarray, sources: np.ndarray, targets: np.ndarray
+) -> np.ndarray:
+    """Find the pairs of links which cross, as a ``(2, k)`` array of link indices.
+
+    A sweep line over the links' bounding boxes finds the candidate pairs, which are
+    then tested exactly. Only proper crossings count, so links which share a node,
+    merely touch or lie along the same line are never reported.
+    """
+    xy = np.asarray(xy, dtype=float).reshape((-1, 2))
+    sources = np.asarray(sources, dtype=np.intp)
+    targets = np.asarray(targets, dtype=np.intp)
+    a = xy[sources]
+    b = xy[targets]
+    boxes = np.concatenate([np.minimum(a, b), np.maximum(a, b)], axis=1)
+    valid = np.flatnonzero(np.isfinite(boxes).all(axis=1) & (sources != targets))
+
+    found = []
+    for i, j in _box_pairs(boxes[valid]):
+        i = valid[i]
+        j = valid[j]
+        shared = (
+            (sources[i] == sources[j])
+            | (sources[i] == targets[j])
+            | (targets[i] == sources[j])
+            | (targets[i] == targets[j])
+        )
+        i = i[~shared]
+        j = j[~shared]
+        (ax, ay), (bx, by) = a[i].T, b[i].T
+        (cx, cy), (dx, dy) = a[j].T, b[j].T
+        hit = (
+            _orientation(ax, ay, bx, by, cx, cy) * _orientation(ax, ay, bx, by, dx, dy)
+            < 0
+        ) & (
+            _orientation(cx, cy, dx, dy, ax, ay) * _orientation(cx, cy, dx, dy, bx, by)
+            < 0
+        )
+        found.append(np.stack([i[hit], j[hit]]))
+    if not found:
+        return np.zeros((2, 0), dtype=np.intp)
+    return np.concatenate(found, axis=1)
+
+
+def crossings(xy: np.ndarray, sources: np.ndarray, targets: np.ndarray) -> int:
+    """Count the pairs of links found by :func:`crossing_pairs`"""
+    return crossing_pairs(xy, sources, targets).shape[1]
+
+
+def simulation_arrays(simulation) -> Dict[str, Optional[np.ndarray]]:
+    """Collect the arrays the metrics need from a :class:`~.ForceSimulation`.
+
+    Links come from every link force and radii from the largest of every collision
+    force. Boxes are only gathered, with ``nan`` rows for nodes without ``bounds``,
+    when at least one node has them.
+    """
+    sources = []
+    targets = []
+    distances = []
+    radii = None
+    for force in simulation.forces.values():
+        if isinstance(force, LinkageForceDirectedLayout) and hasattr(force, "sources"):
+            sources.append(force.sources)
+            targets.append(force.targets)
+            distances.append(np.broadcast_to(force.distances, force.sources.shape))
+        elif isinstance(force, CollisionLayout) and hasattr(force, "radii"):
+            radii = force.radii if radii is None else np.maximum(radii, force.radii)
+
+    xy = simulation.positions()
+    boxes = None
+    bounded = [node for node in simulation.nodes if node.bounds is not None]
+    if bounded:
+        boxes = np.full((len(xy), 4), np.nan)
+        for node in bounded:
+            bbox = node.bounds.relative_to_point(node.x, node.y)
+            boxes[node.index] = bbox.xmin, bbox.ymin, bbox.xmax, bbox.ymax
+
+    concat = lambda arrays, dtype: (
+        np.concatenate(arrays).astype(dtype, copy=False)
+        if arrays
+        else np.zeros(0, dtype=dtype)
+    )
+    return {
+        "xy": xy,
+        "sources": concat(sources, np.intp),
+        "targets": concat(targets, np.intp),
+        "distances": concat(distances, float),
+        "radii": None if radii is None else np.asarray(radii, dtype=float),
+        "boxes": boxes,
+    }
+
+
+def layout_metrics(simulation, samples: int = 100, seed: int = 0) -> Dict[str, Any]:
+    """Compute every metric for a finished :class:`~.ForceSimulation`"""
+    arrays = simulation_arrays(simulation)
+    xy = arrays["xy"]
+    sources = arrays["sources"]
+    targets = arrays["targets"]
+    distances = arrays["distances"]
+    deviation = np.abs(edge_length_deviation(xy, sources, targets, distances))
+    deviation = deviation[np.isfinite(deviation)]
+    return {
+        "nodes": len(xy),
+        "links": len(sources),
+        "stress": stress(xy, sources, targets, distances, samples, seed),
+        "edge_length_mean": float(deviation.mean()) if len(deviation) else 0.0,
+        "edge_length_max": float(deviation.max()) if len(deviation) else 0.0,
+        "overlaps": overlaps(xy, arrays["radii"], arrays["boxes"]),
+        "crossings": crossings(xy, sources, targets),
+    }
@@ -1,5 +1,6 @@
-from dataclasses import dataclass, field
-from typing import Callable, NamedTuple, Optional, Tuple
+import gc
+
+from typing import Callable, List, NamedTuple, Optional, Sequence, Tuple
 
 import numpy as np
 
@@ -71,18 +72,121 @@ class BBox(NamedTuple):
         return self.as_quadrant().intersects_quad(other.as_quadrant())
 
 
-@dataclass
 class VPoint:
+    """A node in a layout.
+
+    Nodes are kept compact with ``__slots__``, and the ``data`` mapping is only created
+    when it is first accessed.
+    """
+
+    __slots__ = ("x", "y", "vx", "vy", "fx", "fy", "index", "fixed", "_data", "bounds")
+
     x: float
     y: float
-    vx: float = None
-    vy: float = None
-    fx: float = None
-    fy: float = None
-    index: int = 0
-    fixed: bool = False
-    data: Optional[dict] = field(default_factory=dict)
-    bounds: Optional[BBox] = None
+    vx: Optional[float]
+    vy: Optional[float]
+    fx: Optional[float]
+    fy: Optional[float]
+    index: int
+    fixed: bool
+    bounds: Optional[BBox]
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        vx: float = None,
+        vy: float = None,
+        fx: float = None,
+        fy: float = None,
+        index: int = 0,
+        fixed: bool = False,
+        data: Optional[dict] = None,
+        bounds: Optional[BBox] = None,
+    ):
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.fx = fx
+        self.fy = fy
+        self.index = index
+        self.fixed = fixed
+        self._data = data
+        self.bounds = bounds
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = {}
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[dict]):
+        self._data = value
+
+    def _astuple(self):
+        return (
+            self.x,
+            self.y,
+            self.vx,
+            self.vy,
+            self.fx,
+            self.fy,
+            self.index,
+            self.fixed,
+            self._data or {},
+            self.bounds,
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(x={self.x!r}, y={self.y!r}, vx={self.vx!r}, "
+            f"vy={self.vy!r}, fx={self.fx!r}, fy={self.fy!r}, index={self.index!r}, "
+            f"fixed={self.fixed!r}, data={self._data or {}!r}, bounds={self.bounds!r})"
+        )
+
+    def __getstate__(self):
+        return self._astuple()
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    @classmethod
+    def from_arrays(
+        cls,
+        x: Sequence[float],
+        y: Sequence[float],
+        fixed: Optional[Sequence[bool]] = None,
+    ) -> List["VPoint"]:
+        """Create one node per position, numbered in order"""
+        x = x.tolist() if isinstance(x, np.ndarray) else list(x)
+        y = y.tolist() if isinstance(y, np.ndarray) else list(y)
+        # None of the new nodes can be part of a reference cycle, so suspend the
+        # cyclic garbage collector rather than let it rescan them as they accumulate
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if fixed is None:
+                return [
+                    cls(xi, yi, None, None, None, None, i)
+                    for i, (xi, yi) in enumerate(zip(x, y))
+                ]
+            fixed = fixed.tolist() if isinstance(fixed, np.ndarray) else list(fixed)
+            return [
+                cls(xi, yi, None, None, None, None, i, fi)
+                for i, (xi, yi, fi) in enumerate(zip(x, y, fixed))
+            ]
+        finally:
+            if gc_enabled:
+                gc.enable()
 
     def as_quadrant(self, width: float = None, height: float = None):
         if width is None or height is None and self.bounds:
@@ -1,12 +1,60 @@
-from dataclasses import dataclass, field
-from typing import Dict, Optional, List, Any, Union, Deque, Generic, TypeVar, Callable
+from dataclasses import dataclass
+from typing import (
+    Dict,
+    Optional,
+    List,
+    Any,
+    Union,
+    Generic,
+    TypeVar,
+    Callable,
+    Tuple,
+)
+
+import numpy as np
 
 
-@dataclass
 class Point:
+    __slots__ = ("x", "y", "_data")
+
     x: float
     y: float
-    data: Optional[dict] = field(default_factory=dict)
+
+    def __init__(self, x: float, y: float, data: Optional[dict] = None):
+        self.x = x
+        self.y = y
+        self._data = data
+
+    @property
+    def data(self) -> dict:
+        if self._data is None:
+            self._data = {}
+        return self._data
+
+    @data.setter
+    def data(self, value: Optional[dict]):
+        self._data = value
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.x, self.y, self._data or {}) == (
+            other.x,
+            other.y,
+            other._data or {},
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"{name}(x={self.x!r}, y={self.y!r}, data={self._data or {}!r})"
+
+    def __getstate__(self):
+        return (self.x, self.y, self._data)
+
+    def __setstate__(self, state):
+        self.__init__(*state)
 
     def as_quadrant(self, width: float, height: float):
         return Quadrant(self.data, self.x, self.y, width, height)
@@ -125,23 +173,40 @@ class QuadTreeNode(_QuadrantMixin):
             self.y + self.height
         )
 
-    def query_range_quad(self, quad: Quadrant):
-        results = []
-        if not self.intersects_quad(quad):
-            return results
-
-        for point in self.points:
-            if quad.contains(point):
-                results.append(point)
-        if not self.is_leaf():
-            for child in self.children:
-                if child:
-                    results.extend(child.query_range_quad(quad))
-        return results
-
-    def query_range(self, x, y, width, height):
-        quad = Quadrant(None, x, y, width, height)
-        results = self.query_range_quad(quad)
+    def query_range_quad(self, quad: Quadrant, results: Optional[List[Point]] = None):
+        return self.query_range(quad.x, quad.y, quad.width, quad.height, results)
+
+    def query_range(self, x, y, width, height, results: Optional[List[Point]] = None):
+        if results is None:
+            results = []
+        x_end = x + width
+        y_end = y + height
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            nx = node.x
+            ny = node.y
+            nx_end = nx + node.width
+            ny_end = ny + node.height
+            if not (nx < x_end and x < nx_end and ny < y_end and y < ny_end):
+                continue
+            if node.points:
+                if x <= nx and nx_end <= x_end and y <= ny and ny_end <= y_end:
+                    results.extend(node.points)
+                else:
+                    for point in node.points:
+                        if x <= point.x < x_end and y <= point.y < y_end:
+                            results.append(point)
+            # Push the children in reverse so they are visited NW, NE, SW, SE
+            children = node.children
+            if children[3] is not None:
+                stack.append(children[3])
+            if children[2] is not None:
+                stack.append(children[2])
+            if children[1] is not None:
+                stack.append(children[1])
+            if children[0] is not None:
+                stack.append(children[0])
         return results
 
 
@@ -190,6 +255,25 @@ class QuadTree:
     def query_range_quad(self, quad: Quadrant):
         return self.root.query_range_quad(quad)
 
+    def query_ranges(
+        self, rects: np.ndarray, key: Callable[[Point], int]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Query many ``(x, y, width, height)`` rectangles at once.
+
+        Returns ``(offsets, indices)`` where the points inside rectangle ``i`` are
+        ``indices[offsets[i]:offsets[i + 1]]``, with each point identified by the
+        integer ``key(point)``, such as ``operator.attrgetter("index")`` for the
+        nodes of a simulation, as the tree does not number plain points itself.
+        """
+        rects = np.asarray(rects, dtype=float).reshape((-1, 4)).tolist()
+        offsets = np.zeros(len(rects) + 1, dtype=np.intp)
+        results = []
+        for i, (x, y, width, height) in enumerate(rects, 1):
+            self.root.query_range(x, y, width, height, results)
+            offsets[i] = len(results)
+        indices = np.fromiter(map(key, results), dtype=np.intp, count=len(results))
+        return offsets, indices
+
     def query_point(self, x, y):
         pt = Point(x, y)
         node = self.root
@@ -205,74 +289,33 @@ class QuadTree:
         return node
 
     def visit(self, callback):
-        quads = Deque()
-        node = self.root
-
-        if node:
-            quads.append(
-                Quadrant(
-                    node,
-                    node.x,
-                    node.y,
-                    node.width,
-                    node.height,
-                )
-            )
-        while quads:
-            q = quads.pop()
-            node = q.data
-            x = q.x
-            y = q.y
-            width = q.width
-            height = q.height
-
-            if not callback(node, x, y, width, height) and node.children:
-                for child_maybe in reversed(node.children):
-                    if child_maybe:
-                        quads.append(
-                            Quadrant(
-                                child_maybe,
-                                child_maybe.x,
-                                child_maybe.y,
-                                child_maybe.width,
-                                child_maybe.height,
-                            )
-                        )
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if not callback(node, node.x, node.y, node.width, node.height):
+                children = node.children
+                if children[3] is not None:
+                    stack.append(children[3])
+                if children[2] is not None:
+                    stack.append(children[2])
+                if children[1] is not None:
+                    stack.append(children[1])
+                if children[0] is not None:
+                    stack.append(children[0])
         return self
 
     def visit_after(self, callback):
         """Visit quadrants in reverse order"""
-        quads = Deque()
-        node = self.root
+        stack = [self.root]
         acc = []
-        if node:
-            quads.append(
-                Quadrant(
-                    node,
-                    node.x,
-                    node.y,
-                    node.width,
-                    node.height,
-                )
-            )
-        while quads:
-            q = quads.pop()
-            node = q.data
-            if node.children:
-                for child_maybe in node.children:
-                    if child_maybe:
-                        quads.append(
-                            Quadrant(
-                                child_maybe,
-                                child_maybe.x,
-                                child_maybe.y,
-                                child_maybe.width,
-                                child_maybe.height,
-                            )
-                        )
-            acc.append(q)
-        for q in reversed(acc):
-            callback(q.data, q.x, q.y, q.width, q.height)
+        while stack:
+            node = stack.pop()
+            for child_maybe in node.children:
+                if child_maybe is not None:
+                    stack.append(child_maybe)
+            acc.append(node)
+        for node in reversed(acc):
+            callback(node, node.x, node.y, node.width, node.height)
         return self
 
     @property
@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .layout import ForceSimulation
+from .point import VPoint
+from .layouts.collide import CollisionLayout
+from .layouts.linkage import LinkArray, LinkageForceDirectedLayout
+from .layouts.manybody import ManyBodyForcesLayout
+from .layouts.xy import XForceLayout, YForceLayout, RadialForceDirectedLayout
+
+FORCE_TYPES = {
+    "link": LinkageForceDirectedLayout,
+    "charge": ManyBodyForcesLayout,
+    "collide": CollisionLayout,
+    "x": XForceLayout,
+    "y": YForceLayout,
+    "radial": RadialForceDirectedLayout,
+}
+
+
+def default_forces() -> Dict[str, Tuple[str, Dict[str, Any]]]:
+    return {
+        "link": ("link", {}),
+        "charge": ("charge", {}),
+        "x": ("x", {}),
+        "y": ("y", {}),
+    }
+
+
+@dataclass
+class LayoutJob:
+    """A layout to compute, described by value so that it can be hashed and sent to
+    another process.
+
+    ``forces`` maps each force's name to its type in :data:`FORCE_TYPES` and the
+    keyword arguments to construct it with, which may be numbers, strings or arrays.
+    ``options`` are passed on to :class:`~.ForceSimulation`. The simulation runs for
+    ``ticks`` ticks, or until ``alpha`` falls below ``alpha_min`` if not given.
+    """
+
+    n: int
+    sources: np.ndarray
+    targets: np.ndarray
+    forces: Dict[str, Tuple[str, Dict[str, Any]]] = field(
+        default_factory=default_forces
+    )
+    seed: int = 42
+    ticks: Optional[int] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.sources = np.asarray(self.sources, dtype=np.int64)
+        self.targets = np.asarray(self.targets, dtype=np.int64)
+
+    def key(self) -> str:
+        """A digest of everything that determines the result"""
+        digest = hashlib.sha256()
+        digest.update(b"force_directed_layout.LayoutJob:1\0")
+        digest.update(_canonical([self.n, self.seed, self.ticks]).encode())
+        digest.update(self.sources.astype("<i8").tobytes())
+        digest.update(b"\0")
+        digest.update(self.targets.astype("<i8").tobytes())
+        digest.update(_canonical(self.forces).encode())
+        digest.update(_canonical(self.options).encode())
+        return digest.hexdigest()
+
+    def build(self) -> ForceSimulation:
+        nodes = VPoint.from_arrays(np.full(self.n, np.nan), np.full(self.n, np.nan))
+        sim = ForceSimulation(
+            nodes, random=np.random.RandomState(self.seed), **self.options
+        )
+        for name, (kind, kwargs) in self.forces.items():
+            cls = FORCE_TYPES[kind]
+            if cls is LinkageForceDirectedLayout:
+                force = cls(
+                    nodes, LinkArray(nodes, self.sources, self.targets), **kwargs
+                )
+            else:
+                force = cls(nodes, **kwargs)
+            sim.add_force(name, force)
+        return sim
+
+    def run(self) -> np.ndarray:
+        """Compute the final ``(n, 2)`` positions"""
+        sim = self.build()
+        sim.init_nodes()
+        sim.init_forces()
+        if self.ticks is not None:
+            sim.tick(self.ticks)
+        else:
+            while sim.alpha >= sim.alpha_min:
+                sim.tick()
+        return sim.positions()
+
+
+def _canonical(value: Any) -> str:
+    def encode(x):
+        if isinstance(x, np.ndarray):
+            x = np.ascontiguousarray(x)
+            return {
+                "array": x.dtype.str,
+                "shape": x.shape,
+                "sha256": hashlib.sha256(x.tobytes()).hexdigest(),
+            }
+        if isinstance(x, np.generic):
+            return x.item()
+        if isinstance(x, np.dtype):
+            return x.str
+        if isinstance(x, type) and issubclass(x, np.generic):
+            return np.dtype(x).str
+        raise TypeError(f"Cannot use {x!r} in a layout cache key")
+
+    return json.dumps(value, sort_keys=True, default=encode)
+
+
+def _run_job(job: LayoutJob) -> np.ndarray:
+    return job.run()
+
+
+class MemoryCache:
+    """Keeps the ``max_items`` most recently used results"""
+
+    def __init__(self, max_items: int = 128):
+        self.max_items = max_items
+        self._items: "OrderedDict[str, np.ndarray]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: np.ndarray):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+
+class DiskCache:
+    """Keeps results as ``.npy`` files in ``directory``, removing the least recently
+    used once they take up more than ``max_bytes``. Files are replaced atomically, so
+    the directory can be shared between processes.
+    """
+
+    def __init__(self, directory: os.PathLike, max_bytes: int = 2**30):
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self.path(key)
+        try:
+            value = np.load(path)
+            # The modification time doubles as the last use for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return value
+
+    def put(self, key: str, value: np.ndarray):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, value)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _follow(source: Future) -> Future:
+    """Get a new future which settles along with ``source``, so that cancelling it
+    leaves ``source`` and its other followers alone.
+    """
+    future = Future()
+
+    def settle(source: Future):
+        if source.cancelled():
+            future.cancel()
+        elif future.set_running_or_notify_cancel():
+            if source.exception() is not None:
+                future.set_exception(source.exception())
+            else:
+                future.set_result(source.result())
+
+    source.add_done_callback(settle)
+    return future
+
+
+class LayoutService:
+    """Computes layouts on a pool of worker processes, caching the results by
+    :meth:`LayoutJob.key` in memory and, if ``directory`` is given, on disk.
+
+    Requests for a job which is already being computed share its result rather than
+    starting another, but each gets a future of its own, so that cancelling one
+    request does not cancel the others. Results are read-only arrays shared between
+    all requesters.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        memory_items: int = 128,
+        directory: Optional[os.PathLike] = None,
+        max_bytes: int = 2**30,
+        executor: Optional[Executor] = None,
+    ):
+        self.memory = MemoryCache(memory_items)
+        self.disk = DiskCache(directory, max_bytes) if directory is not None else None
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(workers)
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._owns_executor:
+            self.executor.shutdown()
+
+    def submit(self, job: LayoutJob) -> "Future[np.ndarray]":
+        key = job.key()
+        with self._lock:
+            value = self.memory.get(key)
+            if value is None and self.disk is not None:
+                value = self.disk.get(key)
+                if value is not None:
+                    value.flags.writeable = False
+                    self.memory.put(key, value)
+            if value is not None:
+                future = Future()
+                future.set_result(value)
+                return future
+            pending = self._pending.get(key)
+            if pending is None:
+                pending = self.executor.submit(_run_job, job)
+                self._pending[key] = pending
+                pending.add_done_callback(lambda f: self._finish(key, f))
+            return _follow(pending)
+
+    def _finish(self, key: str, future: Future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None:
+                return
+            value = future.result()
+            value.flags.writeable = False
+            self.memory.put(key, value)
+        if self.disk is not None:
+            self.disk.put(key, value)
+
+    def layout(self, job: LayoutJob) -> np.ndarray:
+        """Get the final positions for ``job``, waiting for them if need be"""
+        return self.submit(job).result()
+
+    async def layout_async(self, job: LayoutJob) -> np.ndarray:
+        return await asyncio.wrap_future(self.submit(job))
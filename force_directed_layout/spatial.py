@@ -0,0 +1,216 @@
+import heapq
+
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class SpatialIndex:
+    """A static k-d tree over a set of positions answering nearest neighbor,
+    k-nearest neighbor and radius queries.
+
+    Queries return positions in the array the index was built from, and ties in
+    distance are broken in favor of the lower index. Positions which are not finite
+    are never returned.
+    """
+
+    xy: np.ndarray
+    leaf_size: int
+
+    def __init__(self, xy: np.ndarray, leaf_size: int = 16, dtype=float):
+        self.xy = xy = np.asarray(xy, dtype=dtype).reshape((-1, 2))
+        self.leaf_size = leaf_size
+        order = np.flatnonzero(np.isfinite(xy).all(axis=1))
+
+        bounds = []
+        ranges = []
+        children = []
+        if len(order):
+            stack = [(len(ranges), 0, len(order))]
+            bounds.append(None)
+            ranges.append(None)
+            children.append(None)
+        else:
+            stack = []
+        while stack:
+            i, start, stop = stack.pop()
+            block = xy[order[start:stop]]
+            xmin, ymin = block.min(axis=0)
+            xmax, ymax = block.max(axis=0)
+            bounds[i] = (xmin, ymin, xmax, ymax)
+            ranges[i] = (start, stop)
+            if stop - start <= leaf_size:
+                children[i] = None
+                continue
+            dim = 0 if (xmax - xmin) >= (ymax - ymin) else 1
+            mid = (start + stop) // 2
+            part = np.argpartition(block[:, dim], mid - start)
+            order[start:stop] = order[start:stop][part]
+            left = len(ranges)
+            right = left + 1
+            bounds.extend((None, None))
+            ranges.extend((None, None))
+            children.extend((None, None))
+            children[i] = (left, right)
+            stack.append((left, start, mid))
+            stack.append((right, mid, stop))
+
+        self.order = order
+        self._bounds = [tuple(map(float, b)) for b in bounds]
+        self._ranges = ranges
+        self._children = children
+        self._order = order.tolist()
+        self._xs = xy[order, 0].tolist()
+        self._ys = xy[order, 1].tolist()
+
+    def __len__(self):
+        return len(self._order)
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"{name}(<{len(self)} points>, leaf_size={self.leaf_size})"
+
+    @staticmethod
+    def _box_distance2(bounds: Tuple[float, float, float, float], x, y) -> float:
+        xmin, ymin, xmax, ymax = bounds
+        dx = xmin - x if x < xmin else (x - xmax if x > xmax else 0.0)
+        dy = ymin - y if y < ymin else (y - ymax if y > ymax else 0.0)
+        return dx * dx + dy * dy
+
+    def nearest(self, x: float, y: float, radius: Optional[float] = None) -> int:
+        """Find the index of the position closest to ``(x, y)`` strictly within
+        ``radius``, or -1 if there is none.
+        """
+        best = self.knn(x, y, 1, radius)
+        return int(best[0]) if len(best) else -1
+
+    def knn(
+        self, x: float, y: float, k: int, radius: Optional[float] = None
+    ) -> np.ndarray:
+        """Find the indices of the ``k`` positions closest to ``(x, y)``, nearest
+        first, optionally limited to those strictly within ``radius``.
+        """
+        limit = float("inf") if radius is None else radius * radius
+        if not self._ranges or k <= 0:
+            return np.zeros(0, dtype=np.intp)
+        bounds = self._bounds
+        ranges = self._ranges
+        children = self._children
+        xs = self._xs
+        ys = self._ys
+        order = self._order
+        box_distance2 = self._box_distance2
+
+        # A max-heap of the best candidates so far, as (-distance, -index)
+        heap: List[Tuple[float, int]] = []
+        stack = [(box_distance2(bounds[0], x, y), 0)]
+        while stack:
+            d2, i = stack.pop()
+            if d2 >= limit:
+                continue
+            if len(heap) == k and d2 > -heap[0][0]:
+                continue
+            child = children[i]
+            if child is None:
+                start, stop = ranges[i]
+                for j in range(start, stop):
+                    dx = xs[j] - x
+                    dy = ys[j] - y
+                    d2 = dx * dx + dy * dy
+                    if d2 >= limit:
+                        continue
+                    item = (-d2, -order[j])
+                    if len(heap) < k:
+                        heapq.heappush(heap, item)
+                    elif item > heap[0]:
+                        heapq.heapreplace(heap, item)
+            else:
+                left, right = child
+                dl = box_distance2(bounds[left], x, y)
+                dr = box_distance2(bounds[right], x, y)
+                # Visit the nearer child first, so push it last
+                if dl <= dr:
+                    stack.append((dr, right))
+                    stack.append((dl, left))
+                else:
+                    stack.append((dl, left))
+                    stack.append((dr, right))
+        heap.sort(reverse=True)
+        return np.array([-i for _, i in heap], dtype=np.intp)
+
+    def within(self, x: float, y: float, radius: float) -> np.ndarray:
+        """Find the indices of all positions within ``radius`` of ``(x, y)``, in
+        ascending order.
+        """
+        if not self._ranges:
+            return np.zeros(0, dtype=np.intp)
+        r2 = radius * radius
+        bounds = self._bounds
+        ranges = self._ranges
+        children = self._children
+        xs = self._xs
+        ys = self._ys
+        order = self._order
+        box_distance2 = self._box_distance2
+
+        acc = []
+        stack = [0]
+        while stack:
+            i = stack.pop()
+            if box_distance2(bounds[i], x, y) > r2:
+                continue
+            child = children[i]
+            if child is None:
+                start, stop = ranges[i]
+                for j in range(start, stop):
+                    dx = xs[j] - x
+                    dy = ys[j] - y
+                    if dx * dx + dy * dy <= r2:
+                        acc.append(order[j])
+            else:
+                stack.extend(child)
+        acc.sort()
+        return np.array(acc, dtype=np.intp)
+
+    def nearest_many(
+        self, xs: Sequence[float], ys: Sequence[float], radius: Optional[float] = None
+    ) -> np.ndarray:
+        """Batched :meth:`nearest`, returning -1 where there is no match"""
+        return np.array(
+            [self.nearest(x, y, radius) for x, y in zip(_as_list(xs), _as_list(ys))],
+            dtype=np.intp,
+        )
+
+    def knn_many(
+        self,
+        xs: Sequence[float],
+        ys: Sequence[float],
+        k: int,
+        radius: Optional[float] = None,
+    ) -> np.ndarray:
+        """Batched :meth:`knn`, returning a ``(len(xs), k)`` array padded with -1"""
+        xs = _as_list(xs)
+        out = np.full((len(xs), k), -1, dtype=np.intp)
+        for i, (x, y) in enumerate(zip(xs, _as_list(ys))):
+            found = self.knn(x, y, k, radius)
+            out[i, : len(found)] = found
+        return out
+
+    def within_many(
+        self, xs: Sequence[float], ys: Sequence[float], radius: float
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Batched :meth:`within`, returning ``(offsets, indices)`` where the matches
+        for query ``i`` are ``indices[offsets[i]:offsets[i + 1]]``.
+        """
+        xs = _as_list(xs)
+        found = [self.within(x, y, radius) for x, y in zip(xs, _as_list(ys))]
+        offsets = np.zeros(len(found) + 1, dtype=np.intp)
+        offsets[1:] = np.cumsum([len(f) for f in found], dtype=np.intp)
+        indices = np.concatenate(found) if found else np.zeros(0, dtype=np.intp)
+        return offsets, indices.astype(np.intp, copy=False)
+
+
+def _as_list(values) -> list:
+    if isinstance(values, np.ndarray):
+        return values.tolist()
+    return list(values)
@@ -0,0 +1,97 @@
+import os
+
+from typing import Iterator, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class ArrayStorage:
+    """Allocates the per-node and per-link arrays that the forces precompute, such as
+    their parameters and the link endpoints.
+
+    Arrays are held in memory by default. When ``directory`` is given they are instead
+    backed by :class:`numpy.memmap` files in that directory, which the operating
+    system can page out, and loops over them read ``chunk_size`` rows at a time. This
+    does not make a simulation out-of-core: the nodes are Python objects which hold
+    the positions and velocities and always stay in memory.
+
+    ``chunk_bytes`` sets ``chunk_size`` from a budget in bytes for the Python values
+    that each chunk of rows is converted into, assuming ``row_bytes`` bytes per row,
+    which is about what a link's five values take.
+    """
+
+    row_bytes: int = 256
+
+    directory: Optional[str]
+    chunk_size: int
+
+    def __init__(
+        self,
+        directory: Optional[os.PathLike] = None,
+        chunk_size: int = 2**16,
+        chunk_bytes: Optional[int] = None,
+    ):
+        if chunk_bytes is not None:
+            chunk_size = max(chunk_bytes // self.row_bytes, 1)
+        self.directory = os.fspath(directory) if directory is not None else None
+        self.chunk_size = chunk_size
+
+    def __repr__(self):
+        name = self.__class__.__name__
+        return f"{name}({self.directory!r}, chunk_size={self.chunk_size})"
+
+    def allocate(
+        self, name: str, shape: Union[int, Tuple[int, ...]], dtype=float
+    ) -> np.ndarray:
+        """Create a zero-filled array, replacing any earlier array called ``name``"""
+        if self.directory is None or not np.prod(shape):
+            return np.zeros(shape, dtype=dtype)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.dat")
+        return np.memmap(path, dtype=dtype, mode="w+", shape=shape)
+
+    def store(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Copy ``values`` into a new array from :meth:`allocate`"""
+        if self.directory is None:
+            return values
+        values = np.asarray(values)
+        out = self.allocate(name, values.shape, values.dtype)
+        out[...] = values
+        return out
+
+    def chunks(self, n: int) -> Iterator[slice]:
+        for start in range(0, n, self.chunk_size):
+            yield slice(start, min(start + self.chunk_size, n))
+
+
+class NodeState:
+    """A snapshot of the positions and velocities of every node, copied out of the
+    nodes into arrays from an :class:`ArrayStorage` for vectorized reads.
+    """
+
+    x: np.ndarray
+    y: np.ndarray
+    vx: np.ndarray
+    vy: np.ndarray
+
+    _fields = ("x", "y", "vx", "vy")
+
+    def __init__(self, storage: ArrayStorage, n: int, dtype=float):
+        self.storage = storage
+        for name in self._fields:
+            setattr(self, name, storage.allocate(f"state.{name}", n, dtype))
+
+    def __len__(self):
+        return len(self.x)
+
+    def update(self, index: Union[slice, Sequence[int]], nodes: Sequence):
+        """Copy the positions and velocities of ``nodes`` into rows ``index``"""
+        nan = np.nan
+        self.x[index] = [nan if node.x is None else node.x for node in nodes]
+        self.y[index] = [nan if node.y is None else node.y for node in nodes]
+        self.vx[index] = [nan if node.vx is None else node.vx for node in nodes]
+        self.vy[index] = [nan if node.vy is None else node.vy for node in nodes]
+
+    def gather(self, nodes: Sequence):
+        for chunk in self.storage.chunks(len(nodes)):
+            self.update(chunk, nodes[chunk])
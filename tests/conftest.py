@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+from force_directed_layout import (
+    ForceSimulation,
+    LinkageForceDirectedLayout,
+    ManyBodyForcesLayout,
+    VLinkage,
+    VPoint,
+    XForceLayout,
+    YForceLayout,
+)
+
+
+def random_tree(n: int, seed: int = 0):
+    """Link every node after the first to a random earlier node"""
+    random = np.random.RandomState(seed)
+    targets = np.arange(1, n)
+    sources = (random.random_sample(n - 1) * targets).astype(int)
+    return sources, targets
+
+
+def grid(n: int, seed: int = 0):
+    """Link the nodes of a square grid of about ``n`` nodes to their neighbors"""
+    side = math.isqrt(n)
+    index = np.arange(side * side).reshape((side, side))
+    sources = np.concatenate([index[:, :-1].ravel(), index[:-1, :].ravel()])
+    targets = np.concatenate([index[:, 1:].ravel(), index[1:, :].ravel()])
+    return sources, targets
+
+
+GRAPHS = {"tree": random_tree, "grid": grid}
+
+
+@pytest.fixture
+def make_simulation():
+    """Build a simulation of an ``n`` node graph from :data:`GRAPHS` with the usual
+    link, charge and centering forces, which is yet to be entered.
+    """
+
+    def build(n=300, graph="tree", seed=0, **kwargs) -> ForceSimulation:
+        sources, targets = GRAPHS[graph](n, seed)
+        n = max(n, int(sources.max()) + 1, int(targets.max()) + 1)
+        nodes = [VPoint(np.nan, np.nan) for _ in range(n)]
+        links = [
+            VLinkage(nodes[s], nodes[t])
+            for s, t in zip(sources.tolist(), targets.tolist())
+        ]
+        sim = ForceSimulation(nodes, **kwargs)
+        sim.add_force("link", LinkageForceDirectedLayout(nodes, links))
+        sim.add_force("charge", ManyBodyForcesLayout(nodes))
+        sim.add_force("x", XForceLayout(nodes))
+        sim.add_force("y", YForceLayout(nodes))
+        return sim
+
+    return build
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from force_directed_layout import (
+    ForceSimulation,
+    LinkageForceDirectedLayout,
+    VLinkage,
+    VPoint,
+)
+from force_directed_layout.layouts.base import Fn, Vectorized, evaluate
+
+
+def test_constant_array_and_callable():
+    items = [VPoint(0, 0), VPoint(1, 1), VPoint(2, 2)]
+    for i, item in enumerate(items):
+        item.index = i
+    np.testing.assert_array_equal(evaluate(Fn(2.5), items), [2.5, 2.5, 2.5])
+    np.testing.assert_array_equal(evaluate(Fn([1, 2, 3]), items), [1, 2, 3])
+    np.testing.assert_array_equal(
+        evaluate(Fn(lambda item, i, items: item.x + i), items, indexed=True), [0, 2, 4]
+    )
+    np.testing.assert_array_equal(
+        evaluate(Vectorized(lambda items: [item.y for item in items]), items),
+        [0, 1, 2],
+    )
+    with pytest.raises(ValueError):
+        evaluate(Fn([1, 2]), items)
+
+
+def test_field():
+    items = [VPoint(0, 0, data={"weight": w}) for w in (1.0, 2.0)]
+    np.testing.assert_array_equal(evaluate(Fn("weight"), items), [1.0, 2.0])
+    assert Fn("weight")(items[1]) == 2.0
+
+
+def test_missing_field_raises():
+    items = [VPoint(0, 0, data={"weight": 1.0}), VPoint(0, 0)]
+    with pytest.raises(KeyError):
+        evaluate(Fn("weight"), items)
+
+
+def test_field_without_data_raises():
+    nodes = [VPoint(0, 0), VPoint(10, 0)]
+    for i, node in enumerate(nodes):
+        node.index = i
+    links = [VLinkage(nodes[0], nodes[1])]
+    with pytest.raises(TypeError):
+        evaluate(Fn("weight"), links)
+
+    sim = ForceSimulation(nodes)
+    sim.add_force("link", LinkageForceDirectedLayout(nodes, links, distance="weight"))
+    with pytest.raises(TypeError):
+        sim.__enter__()
@@ -0,0 +1,68 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from force_directed_layout.aio import AsyncSimulation
+
+
+async def collect(subscription, frames):
+    async for frame in subscription:
+        frames.append(frame)
+
+
+def test_run_publishes_frames(make_simulation):
+    driver = AsyncSimulation(make_simulation().__enter__(), slice_seconds=0.001)
+
+    async def main():
+        frames = []
+        consumer = asyncio.ensure_future(collect(driver.subscribe(), frames))
+        await driver.run(30)
+        await consumer
+        return frames
+
+    frames = asyncio.run(main())
+    ticks = [frame.ticks for frame in frames]
+    assert ticks == sorted(ticks)
+    assert frames[-1].done and not any(frame.done for frame in frames[:-1])
+    assert frames[-1].ticks == 30
+    assert not driver.running
+
+    expected = make_simulation().__enter__().tick(30)
+    np.testing.assert_array_equal(frames[-1].positions, expected.positions())
+
+
+def test_run_until_cool(make_simulation):
+    sim = make_simulation().__enter__()
+    asyncio.run(AsyncSimulation(sim).run())
+    assert sim.alpha < sim.alpha_min
+
+
+def test_cancel_on_executor(make_simulation):
+    driver = AsyncSimulation(
+        make_simulation().__enter__(),
+        slice_seconds=0.001,
+        executor=ThreadPoolExecutor(1),
+    )
+
+    async def main():
+        subscription = driver.subscribe()
+        task = driver.start()
+        with pytest.raises(RuntimeError):
+            driver.run()
+        frame = await subscription.__anext__()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        frames = [frame]
+        await collect(subscription, frames)
+        return frames
+
+    frames = asyncio.run(main())
+    assert frames[-1].done
+    assert frames[-1].ticks == driver.simulation.ticks < 300
+    assert not driver.running
+    # A finished run is replayed to late subscribers
+    assert asyncio.run(driver.subscribe().__anext__()) is driver.frame
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from force_directed_layout.benchmarks import GENERATORS, compare, load, run_graph, save
+from force_directed_layout.benchmarks.__main__ import main
+from force_directed_layout.benchmarks.generators import scale_free
+
+
+@pytest.mark.parametrize("name", sorted(GENERATORS))
+def test_generators(name):
+    graph = GENERATORS[name](500)
+    assert graph.n == 500
+    assert len(graph.sources) == len(graph.targets) > 0
+    for ends in (graph.sources, graph.targets):
+        assert ends.min() >= 0 and ends.max() < graph.n
+    assert not (graph.sources == graph.targets).any()
+
+
+def test_scale_free_attachment():
+    # The same process grown one node at a time
+    n, m, seed = 300, 3, 4
+    random = np.random.RandomState(seed)
+    picks = random.random_sample((n - 1, m)).tolist()
+    endpoints = [0]
+    targets = []
+    for i in range(1, n):
+        size = len(endpoints)
+        targets.extend(endpoints[int(r * size)] for r in picks[i - 1])
+        endpoints.extend(targets[-m:])
+        endpoints.extend([i] * m)
+    graph = scale_free(n, m, seed)
+    np.testing.assert_array_equal(graph.sources, np.repeat(np.arange(1, n), m))
+    np.testing.assert_array_equal(graph.targets, targets)
+
+
+def test_steps_are_independent():
+    graph = GENERATORS["tree"](50)
+    options = dict(ticks=3, queries=10, repeat=1, memory=False, metrics=True)
+    alone = run_graph(graph, steps=["metrics"], **options)
+    everything = run_graph(graph, **options)
+    assert [r["metrics"] for r in alone] == [
+        r["metrics"] for r in everything if r["step"] == "metrics"
+    ]
+
+
+def test_compare():
+    def results(seconds):
+        return {
+            "results": [
+                {"graph": "tree", "nodes": 10, "step": "tick", "seconds": seconds}
+            ]
+        }
+
+    (row,) = compare(results(1.05), results(1.0), tolerance=0.1)
+    assert row["ratio"] == pytest.approx(1.05)
+    assert not row["regression"]
+    (row,) = compare(results(1.2), results(1.0), tolerance=0.1)
+    assert row["regression"]
+
+
+def test_cli_compares_against_missing_metrics(tmp_path, capsys):
+    output = str(tmp_path / "results.json")
+    args = ["--graphs", "tree", "--sizes", "30", "--steps", "metrics"]
+    args += ["--ticks", "2", "--repeat", "1", "--no-memory", "--metrics"]
+    assert main(args + ["--output", output]) == 0
+    baseline = load(output)
+    for result in baseline["results"]:
+        del result["metrics"]["stress"]
+    save(baseline, output)
+    capsys.readouterr()
+    main(args + ["--baseline", output, "--tolerance", "1e9"])
+    lines = capsys.readouterr().out.splitlines()
+    assert any("stress" in line and "(was n/a)" in line for line in lines)
@@ -0,0 +1,74 @@
+from collections import deque
+
+import numpy as np
+import pytest
+
+from force_directed_layout import CollisionLayout
+
+
+def layout(make_simulation, n, dtype, graph="tree", ticks=300):
+    sim = make_simulation(n, graph, dtype=dtype)
+    sim.add_force("collide", CollisionLayout(sim.nodes, radius=3))
+    sim.__enter__()
+    sim.tick(ticks)
+    return sim
+
+
+def node_positions(sim):
+    return np.array([(node.x, node.y) for node in sim.nodes])
+
+
+def quality(sim):
+    """The mean squared relative error between layout and graph distances over every
+    pair of nodes, and the mean relative error of the link lengths.
+    """
+    xy = node_positions(sim)
+    neighbors = [[] for _ in sim.nodes]
+    for link in sim.forces["link"].links:
+        neighbors[link.source.index].append(link.target.index)
+        neighbors[link.target.index].append(link.source.index)
+    errors = []
+    for origin in range(len(xy)):
+        hops = np.full(len(xy), np.inf)
+        hops[origin] = 0
+        queue = deque([origin])
+        while queue:
+            i = queue.popleft()
+            for j in neighbors[i]:
+                if hops[j] == np.inf:
+                    hops[j] = hops[i] + 1
+                    queue.append(j)
+        valid = np.isfinite(hops) & (hops > 0)
+        lengths = np.hypot(*(xy[valid] - xy[origin]).T)
+        errors.append((lengths - hops[valid] * 30.0) / (hops[valid] * 30.0))
+    stress = np.mean(np.concatenate(errors) ** 2)
+    lengths = np.array([link.distance() for link in sim.forces["link"].links])
+    return stress, np.abs(lengths - 30.0).mean() / 30.0
+
+
+def test_float32_arrays(make_simulation):
+    sim = layout(make_simulation, 50, np.float32, ticks=1)
+    assert sim.forces["link"].distances.dtype == np.float32
+    assert sim.forces["charge"].strengths.dtype == np.float32
+    assert sim.forces["collide"].radii.dtype == np.float32
+    assert all(type(node.x) is float and type(node.vx) is float for node in sim.nodes)
+
+
+def test_float32_positions(make_simulation):
+    expected = node_positions(layout(make_simulation, 100, np.float64))
+    actual = node_positions(layout(make_simulation, 100, np.float32))
+    extent = np.ptp(expected, axis=0).max()
+    error = np.hypot(*(actual - expected).T) / extent
+    assert np.median(error) < 5e-3
+    assert error.max() < 5e-2
+
+
+@pytest.mark.parametrize("graph", ["tree", "grid"])
+def test_float32_quality(make_simulation, graph):
+    (stress64, deviation64), (stress32, deviation32) = [
+        quality(layout(make_simulation, 100, dtype, graph))
+        for dtype in (np.float64, np.float32)
+    ]
+    # Scaling the initial layout by 1e-4 moves these by up to 20%
+    assert stress32 == pytest.approx(stress64, rel=0.05)
+    assert deviation32 == pytest.approx(deviation64, rel=0.05)
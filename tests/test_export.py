@@ -0,0 +1,99 @@
+import io
+import json
+
+import numpy as np
+import pytest
+
+from force_directed_layout import ForceSimulation
+from force_directed_layout.export import (
+    node_columns,
+    to_npz,
+    write_jsonl,
+    write_links_jsonl,
+)
+
+
+def simulation():
+    sim = ForceSimulation.from_edges(
+        ["a", "b", "c"],
+        ["b", "c", "d"],
+        columns={"100% size": np.array([1.5, 2.0, np.nan, 4.0])},
+    ).__enter__()
+    sim.tick(5)
+    for i, node in enumerate(sim.nodes):
+        node.data["label"] = f'"{i}"'
+    return sim
+
+
+def test_write_jsonl():
+    sim = simulation()
+    stream = io.StringIO()
+    write_jsonl(sim, stream, fields=["100% size", "label"], chunk_size=3)
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == ["a", "b", "c", "d"]
+    assert [row["100% size"] for row in rows] == [1.5, 2.0, None, 4.0]
+    assert [row["label"] for row in rows] == ['"0"', '"1"', '"2"', '"3"']
+    assert [[row["x"], row["y"]] for row in rows] == sim.positions().tolist()
+
+
+def test_write_links_jsonl():
+    sim = simulation()
+    stream = io.StringIO()
+    write_links_jsonl(sim, stream, ids=True, chunk_size=2)
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert rows == [
+        {"source": "a", "target": "b"},
+        {"source": "b", "target": "c"},
+        {"source": "c", "target": "d"},
+    ]
+
+
+def test_to_npz(tmp_path):
+    sim = simulation()
+    path = tmp_path / "layout.npz"
+    to_npz(sim, path, fields=["label"], compressed=True)
+    with np.load(path, allow_pickle=False) as arrays:
+        assert arrays["id"].tolist() == ["a", "b", "c", "d"]
+        assert arrays["label"].tolist() == ['"0"', '"1"', '"2"', '"3"']
+        np.testing.assert_array_equal(
+            np.column_stack([arrays["x"], arrays["y"]]), sim.positions()
+        )
+        assert arrays["source"].tolist() == [0, 1, 2]
+        assert arrays["target"].tolist() == [1, 2, 3]
+
+
+def test_node_columns_errors():
+    sim = simulation()
+    with pytest.raises(ValueError):
+        node_columns(sim, fields=["x"])
+    with pytest.raises(KeyError):
+        node_columns(sim, fields=["missing"])
+
+
+def test_to_arrow():
+    pytest.importorskip("pyarrow")
+    from force_directed_layout.export import to_arrow
+
+    nodes, links = to_arrow(simulation(), fields=["label"])
+    assert nodes.column_names == ["id", "x", "y", "label"]
+    assert links.num_rows == 3
+
+
+def test_write_jsonl_data_fields_are_valid_json():
+    sim = simulation()
+    values = [np.nan, 1.0, "a", None]
+    for node, value in zip(sim.nodes, values):
+        node.data["w"] = value
+        node.data["v"] = np.inf if node.index else 2.0
+    stream = io.StringIO()
+    write_jsonl(sim, stream, fields=["w", "v"])
+
+    def reject(constant):
+        raise ValueError(constant)
+
+    rows = [
+        json.loads(line, parse_constant=reject)
+        for line in stream.getvalue().splitlines()
+    ]
+    assert [row["w"] for row in rows] == [None, 1.0, "a", None]
+    assert [row["v"] for row in rows] == [2.0, None, None, None]
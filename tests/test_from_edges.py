@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from force_directed_layout import ForceSimulation
+
+
+def links(sim):
+    force = sim.forces["link"]
+    return list(zip(force.links.sources.tolist(), force.links.targets.tolist()))
+
+
+def test_sorted_ids():
+    sim = ForceSimulation.from_edges(["b", "c", "a"], ["a", "a", "d"])
+    assert sim.node_ids.tolist() == ["a", "b", "c", "d"]
+    assert len(sim.nodes) == 4
+    assert links(sim) == [(1, 0), (2, 0), (0, 3)]
+
+
+def test_given_ids():
+    sim = ForceSimulation.from_edges(
+        [30, 10], [20, 30], ids=[30, 20, 10, 40], columns={"size": [1, 2, 3, 4]}
+    )
+    assert sim.node_ids.tolist() == [30, 20, 10, 40]
+    assert links(sim) == [(0, 1), (2, 0)]
+    assert sim.columns["size"].tolist() == [1, 2, 3, 4]
+
+
+def test_invalid():
+    with pytest.raises(ValueError):
+        ForceSimulation.from_edges([1, 2], [3])
+    with pytest.raises(ValueError):
+        ForceSimulation.from_edges([1], [2], ids=[1, 2, 1])
+    with pytest.raises(KeyError):
+        ForceSimulation.from_edges([1], [5], ids=[1, 2])
+    with pytest.raises(ValueError):
+        ForceSimulation.from_edges([1], [2], columns={"size": [1]})
+
+
+def test_empty_graph():
+    sim = ForceSimulation.from_edges([], []).__enter__()
+    sim.tick(2)
+    assert sim.positions().shape == (0, 2)
+    assert sim.neighborhood([]) == []
+    assert sim.find(0, 0) is None
+
+
+def test_from_dataframe():
+    edges = {"u": ["x", "y"], "v": ["y", "z"], "weight": [10.0, 20.0]}
+    nodes = {"id": ["z", "y", "x"], "label": ["Z", "Y", "X"], "size": [3, 2, 1]}
+    sim = ForceSimulation.from_dataframe(
+        edges, "u", "v", nodes, distance="weight", fields=["label"]
+    )
+    assert sim.node_ids.tolist() == ["z", "y", "x"]
+    assert links(sim) == [(2, 1), (1, 0)]
+    assert list(sim.columns) == ["label"]
+    sim.__enter__()
+    assert sim.forces["link"].distances.tolist() == [10.0, 20.0]
+
+
+def test_from_networkx():
+    nx = pytest.importorskip("networkx")
+    graph = nx.Graph()
+    graph.add_node("b", size=2.0)
+    graph.add_node("a")
+    graph.add_edge("a", "b", length=5.0)
+    sim = ForceSimulation.from_networkx(graph, distance="length", fields=["size"])
+    assert sim.node_ids.tolist() == ["b", "a"]
+    np.testing.assert_array_equal(sim.columns["size"], [2.0, np.nan])
+    assert len(links(sim)) == 1
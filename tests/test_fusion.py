@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+
+from force_directed_layout import (
+    ForceSimulation,
+    RadialForceDirectedLayout,
+    VPoint,
+    XForceLayout,
+    YForceLayout,
+)
+from force_directed_layout.storage import ArrayStorage
+
+
+def simulation(make_simulation, fuse=True, **kwargs):
+    sim = make_simulation(200, **kwargs)
+    sim.add_force(
+        "radial", RadialForceDirectedLayout(sim.nodes, x=1.0, y=2.0, radius=50.0)
+    )
+    for node in sim.nodes[::17]:
+        node.fixed = True
+        node.x = float(node.index)
+        node.y = -float(node.index)
+    for node in sim.nodes[3::23]:
+        node.fx = 5.0
+    for node in sim.nodes[5::29]:
+        node.fy = -7.0
+    if not fuse:
+        sim.fused_forces = lambda: {}
+    sim.__enter__()
+    return sim
+
+
+def state(sim):
+    return np.array([(node.x, node.y, node.vx, node.vy) for node in sim.nodes])
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+@pytest.mark.parametrize("chunk_size", [2**16, 37])
+def test_fused_matches_sequential(make_simulation, dtype, chunk_size):
+    fused, sequential = [
+        simulation(
+            make_simulation,
+            fuse,
+            dtype=dtype,
+            storage=ArrayStorage(chunk_size=chunk_size),
+        )
+        for fuse in (True, False)
+    ]
+    assert list(fused.fused_forces()) == ["x", "y", "radial"]
+    for sim in (fused, sequential):
+        sim.tick(10)
+        sim.relax([5, 40], hops=2, iterations=3)
+    np.testing.assert_array_equal(state(fused), state(sequential))
+
+
+def test_overridden_force_is_not_fused(make_simulation):
+    class PushX(XForceLayout):
+        def force(self, alpha):
+            super().force(alpha)
+            for node in self.nodes:
+                if not node.fixed:
+                    node.vx += 100
+
+    class PushY(YForceLayout):
+        def __call__(self, alpha):
+            super().__call__(alpha)
+            for node in self.nodes:
+                if not node.fixed:
+                    node.vy += 100
+
+    assert XForceLayout.local and not PushX.local and not PushY.local
+    sim = simulation(make_simulation)
+    base = simulation(make_simulation)
+    sim.add_force("push_x", PushX(sim.nodes))
+    sim.add_force("push_y", PushY(sim.nodes))
+    assert "push_x" not in sim.fused_forces()
+    sim.tick()
+    base.tick()
+    mobile = [not node.fixed and node.fx is None for node in sim.nodes]
+    assert (state(sim)[mobile, 0] > state(base)[mobile, 0] + 10).all()
+
+
+def test_fused_forces_are_profiled(make_simulation):
+    sim = simulation(make_simulation)
+    profiler = sim.instrument()
+    sim.tick(2)
+    forces = profiler.summary()["forces"]
+    for name in ("x", "y", "radial"):
+        assert forces[name]["fused"] == 2
+        assert forces[name]["time"] > 0
+    record = profiler.records[-1]
+    assert record["integrate"] > 0
+    assert record["time"] >= record["integrate"] + sum(
+        entry["time"] for entry in record["forces"].values()
+    )
+
+
+def test_force_on_some_nodes_is_not_fused():
+    def run(fuse):
+        nodes = VPoint.from_arrays(np.arange(10.0), np.zeros(10))
+        sim = ForceSimulation(nodes)
+        sim.add_force("x", XForceLayout(nodes[5:], x=100.0, strength=1.0))
+        sim.add_force("y", YForceLayout(nodes, y=10.0))
+        if not fuse:
+            sim.fused_forces = lambda: {}
+        sim.__enter__()
+        assert list(sim.fused_forces()) == (["y"] if fuse else [])
+        sim.tick()
+        return state(sim)
+
+    fused = run(True)
+    np.testing.assert_array_equal(fused, run(False))
+    np.testing.assert_array_equal(fused[:5, 0], np.arange(5.0))
+    assert (fused[5:, 0] > np.arange(5.0, 10.0)).all()
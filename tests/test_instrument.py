@@ -0,0 +1,58 @@
+import io
+import json
+
+import numpy as np
+
+from force_directed_layout import CollisionLayout
+
+
+def simulation(make_simulation):
+    sim = make_simulation()
+    sim.add_force("collide", CollisionLayout(sim.nodes, radius=3.0))
+    return sim.__enter__()
+
+
+def test_records(make_simulation):
+    sim = simulation(make_simulation)
+    before = []
+    after = []
+    profiler = sim.instrument()
+    profiler.before_tick.append(lambda s: before.append(s.ticks))
+    profiler.after_tick.append(lambda s, record: after.append(record["tick"]))
+    sim.tick(5)
+
+    assert before == [0, 1, 2, 3, 4]
+    assert after == [1, 2, 3, 4, 5]
+    assert [record["tick"] for record in profiler.records] == after
+    for record in profiler.records:
+        forces = record["forces"]
+        assert set(forces) == {"link", "charge", "collide", "x", "y"}
+        for name in ("charge", "collide"):
+            assert forces[name]["visits"] > 0
+            assert (
+                forces[name]["build"] + forces[name]["traverse"] <= forces[name]["time"]
+            )
+        assert sum(entry["time"] for entry in forces.values()) <= record["time"]
+
+    summary = profiler.summary()
+    assert summary["ticks"] == 5
+    assert summary["forces"]["charge"]["visits"] == sum(
+        record["forces"]["charge"]["visits"] for record in profiler.records
+    )
+    stream = io.StringIO()
+    profiler.write_jsonl(stream)
+    lines = stream.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == profiler.records
+
+    assert sim.uninstrument() is profiler
+    sim.tick(2)
+    assert len(profiler.records) == 5
+
+
+def test_profiling_does_not_change_the_layout(make_simulation):
+    profiled = simulation(make_simulation)
+    profiled.instrument()
+    plain = simulation(make_simulation)
+    for sim in (profiled, plain):
+        sim.tick(20)
+    np.testing.assert_array_equal(profiled.positions(), plain.positions())
@@ -0,0 +1,26 @@
+import numpy as np
+
+from force_directed_layout import CollisionLayout, ForceSimulation, VPoint
+from force_directed_layout.layouts.base import Jitter
+
+
+def test_values_follow_the_random_state():
+    jitter = Jitter(np.random.RandomState(7), block_size=10)
+    values = [jitter() for _ in range(25)]
+    expected = (np.random.RandomState(7).random_sample(30)[:25] - 0.5) * 1e-6
+    np.testing.assert_array_equal(values, expected)
+    assert all(isinstance(value, float) for value in values)
+
+
+def test_coincident_nodes_separate_reproducibly():
+    def run():
+        nodes = [VPoint(0.0, 0.0) for _ in range(50)]
+        sim = ForceSimulation(nodes)
+        sim.add_force("collide", CollisionLayout(nodes, radius=1.0))
+        sim.__enter__()
+        sim.tick(5)
+        return np.array([(node.x, node.y) for node in nodes])
+
+    first = run()
+    assert len(np.unique(first, axis=0)) == len(first)
+    np.testing.assert_array_equal(first, run())
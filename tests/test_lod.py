@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from force_directed_layout.lod import LevelOfDetailIndex
+
+
+@pytest.fixture
+def xy():
+    return np.random.RandomState(0).normal(0, 100, size=(2000, 2))
+
+
+def visible(xy, viewport):
+    x, y, width, height = viewport
+    return (
+        (x <= xy[:, 0])
+        & (xy[:, 0] < x + width)
+        & (y <= xy[:, 1])
+        & (xy[:, 1] < y + height)
+    )
+
+
+@pytest.mark.parametrize("max_points", [1, 10, 100, 5000])
+def test_query_budget(xy, max_points):
+    index = LevelOfDetailIndex.from_positions(xy)
+    viewport = (-1000, -1000, 2000, 2000)
+    found = index.query(viewport, max_points)
+    assert 0 < len(found) <= max_points
+    assert found.count.sum() == len(xy)
+    if max_points >= len(xy):
+        assert (found.count == 1).all()
+        assert sorted(found.node.tolist()) == list(range(len(xy)))
+        np.testing.assert_array_equal(
+            np.column_stack([found.x, found.y]), xy[found.node]
+        )
+
+
+def test_query_viewport(xy):
+    index = LevelOfDetailIndex.from_positions(xy)
+    viewport = (-50, -20, 80, 60)
+    found = index.query(viewport, len(xy))
+    expected = np.flatnonzero(visible(xy, viewport))
+    assert sorted(found.node.tolist()) == expected.tolist()
+    assert len(index.query(viewport, 0)) == 0
+    assert len(index.query((1e6, 1e6, 1, 1), 10)) == 0
+
+
+def test_save_load(xy, tmp_path):
+    index = LevelOfDetailIndex.from_positions(xy)
+    index.save(tmp_path)
+    loaded = LevelOfDetailIndex.load(tmp_path)
+    assert isinstance(loaded.positions, np.memmap)
+    viewport = (-100, -100, 150, 150)
+    for a, b in zip(index.query(viewport, 50), loaded.query(viewport, 50)):
+        np.testing.assert_array_equal(a, b)
@@ -0,0 +1,100 @@
+from collections import deque
+from itertools import combinations
+
+import numpy as np
+
+from force_directed_layout.benchmarks import GENERATORS
+from force_directed_layout.metrics import (
+    crossing_pairs,
+    graph_distances,
+    layout_metrics,
+    overlapping_pairs,
+)
+
+
+def pairs(found):
+    return {tuple(sorted(pair)) for pair in found.T.tolist()}
+
+
+def test_graph_distances():
+    graph = GENERATORS["components"](60, size=7)
+    neighbors = {i: set() for i in range(graph.n)}
+    for s, t in zip(graph.sources.tolist(), graph.targets.tolist()):
+        neighbors[s].add(t)
+        neighbors[t].add(s)
+    origins = [0, 9, 59]
+    distances = graph_distances(graph.n, graph.sources, graph.targets, origins)
+    for row, origin in zip(distances, origins):
+        expected = np.full(graph.n, np.inf)
+        expected[origin] = 0
+        queue = deque([origin])
+        while queue:
+            i = queue.popleft()
+            for j in neighbors[i]:
+                if expected[j] == np.inf:
+                    expected[j] = expected[i] + 1
+                    queue.append(j)
+        np.testing.assert_array_equal(row, expected)
+
+
+def test_overlapping_pairs():
+    random = np.random.RandomState(0)
+    xy = random.uniform(0, 100, size=(300, 2))
+    xy[7] = np.nan
+    radii = random.uniform(0, 4, size=300)
+    boxes = np.full((300, 4), np.nan)
+    boxes[::10] = np.column_stack([xy[::10] - 6, xy[::10] + 6])
+
+    def overlap(i, j):
+        if not np.isfinite(xy[[i, j]]).all():
+            return False
+        hit = ((xy[i] - xy[j]) ** 2).sum() < (radii[i] + radii[j]) ** 2
+        bi, bj = boxes[i], boxes[j]
+        if np.isfinite(bi).all() and np.isfinite(bj).all():
+            hit |= bi[0] < bj[2] and bj[0] < bi[2] and bi[1] < bj[3] and bj[1] < bi[3]
+        return hit
+
+    expected = {(i, j) for i, j in combinations(range(300), 2) if overlap(i, j)}
+    assert pairs(overlapping_pairs(xy, radii, boxes)) == expected
+
+
+def test_crossing_pairs():
+    random = np.random.RandomState(1)
+    xy = random.uniform(0, 100, size=(60, 2))
+    sources = random.randint(0, 60, size=120)
+    targets = random.randint(0, 60, size=120)
+
+    def orientation(a, b, c):
+        return np.sign((b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0]))
+
+    def cross(i, j):
+        ends = {sources[i], targets[i], sources[j], targets[j]}
+        if len(ends) < 4:
+            return False
+        a, b, c, d = xy[[sources[i], targets[i], sources[j], targets[j]]]
+        return (
+            orientation(a, b, c) * orientation(a, b, d) < 0
+            and orientation(c, d, a) * orientation(c, d, b) < 0
+        )
+
+    expected = {(i, j) for i, j in combinations(range(120), 2) if cross(i, j)}
+    assert pairs(crossing_pairs(xy, sources, targets)) == expected
+
+
+def test_crossing_pairs_ignores_touching_links():
+    xy = np.array([[0, 0], [2, 2], [0, 2], [2, 0], [1, 1], [3, 3]], dtype=float)
+    # The first two links cross, the third shares a node with the first and the
+    # fourth only touches the first at its end
+    sources = np.array([0, 2, 1, 4])
+    targets = np.array([1, 3, 5, 5])
+    assert pairs(crossing_pairs(xy, sources, targets)) == {(0, 1)}
+
+
+def test_layout_metrics(make_simulation):
+    sim = make_simulation(100, "grid").__enter__().tick(50)
+    metrics = layout_metrics(sim)
+    assert metrics["nodes"] == 100
+    assert metrics["links"] == len(sim.forces["link"].links) == 180
+    assert metrics["stress"] > 0
+    assert metrics["crossings"] >= 0
+    assert metrics == layout_metrics(sim)
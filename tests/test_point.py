@@ -0,0 +1,50 @@
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from force_directed_layout import VPoint
+from force_directed_layout.point import BBox
+from force_directed_layout.quadtree import Point
+
+
+def test_vpoint_slots():
+    node = VPoint(1.0, 2.0)
+    assert not hasattr(node, "__dict__")
+    with pytest.raises(AttributeError):
+        node.other = 1
+    assert node._data is None
+    node.data["label"] = "a"
+    assert node.data == {"label": "a"}
+    assert VPoint(1.0, 2.0) == VPoint(1.0, 2.0, data={})
+    assert VPoint(1.0, 2.0) != VPoint(1.0, 3.0)
+    with pytest.raises(TypeError):
+        hash(node)
+
+
+def test_vpoint_copies():
+    node = VPoint(1.0, 2.0, 3.0, 4.0, fx=5.0, index=6, fixed=True)
+    node.data["label"] = "a"
+    node.bounds = BBox(-1, -1, 1, 1, Point(0, 0))
+    for other in (pickle.loads(pickle.dumps(node)), copy.deepcopy(node)):
+        assert other == node
+        assert other.data is not node.data
+    assert copy.copy(node) == node
+
+
+def test_from_arrays():
+    nodes = VPoint.from_arrays(np.array([1.0, 2.0]), [3.0, 4.0], fixed=[False, True])
+    assert [(node.x, node.y, node.index, node.fixed) for node in nodes] == [
+        (1.0, 3.0, 0, False),
+        (2.0, 4.0, 1, True),
+    ]
+    assert all(type(node.x) is float for node in nodes)
+
+
+def test_point_slots():
+    point = Point(1.0, 2.0)
+    assert not hasattr(point, "__dict__")
+    assert point._data is None
+    assert point == Point(1.0, 2.0, {})
+    assert pickle.loads(pickle.dumps(point)) == point
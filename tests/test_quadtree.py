@@ -0,0 +1,49 @@
+from operator import attrgetter
+
+import numpy as np
+
+from force_directed_layout import VPoint
+from force_directed_layout.quadtree import Point, QuadTree
+
+
+def brute_ranges(xy, rects):
+    found = []
+    for x, y, width, height in rects:
+        inside = (
+            (x <= xy[:, 0])
+            & (xy[:, 0] < x + width)
+            & (y <= xy[:, 1])
+            & (xy[:, 1] < y + height)
+        )
+        found.append(np.flatnonzero(inside))
+    return found
+
+
+def rects():
+    random = np.random.RandomState(1)
+    corners = random.uniform(-10, 110, size=(50, 2))
+    sizes = random.uniform(0, 40, size=(50, 2))
+    return np.column_stack([corners, sizes])
+
+
+def check(tree, xy, rects, key):
+    offsets, indices = tree.query_ranges(rects, key)
+    assert len(offsets) == len(rects) + 1
+    for i, expected in enumerate(brute_ranges(xy, rects)):
+        np.testing.assert_array_equal(
+            np.sort(indices[offsets[i] : offsets[i + 1]]), expected
+        )
+
+
+def test_query_ranges_points():
+    xy = np.random.RandomState(0).uniform(0, 100, size=(500, 2))
+    points = [Point(x, y, {"i": i}) for i, (x, y) in enumerate(xy.tolist())]
+    tree = QuadTree.from_points(points)
+    check(tree, xy, rects(), lambda point: point.data["i"])
+
+
+def test_query_ranges_nodes():
+    xy = np.random.RandomState(0).uniform(0, 100, size=(500, 2))
+    nodes = [VPoint(x, y, index=i) for i, (x, y) in enumerate(xy.tolist())]
+    tree = QuadTree.from_points(nodes)
+    check(tree, xy, rects(), attrgetter("index"))
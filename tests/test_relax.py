@@ -0,0 +1,57 @@
+from force_directed_layout import Fn, ForceSimulation, VPoint, XForceLayout
+
+
+def node_positions(sim):
+    return [(node.x, node.y) for node in sim.nodes]
+
+
+def test_relax_reuses_far_field(make_simulation):
+    sim = make_simulation().__enter__().tick(5)
+    charge = sim.forces["charge"]
+    sim.relax([0])
+    tree = charge.frozen_tree
+    assert tree is not None
+    sim.relax([0])
+    assert charge.frozen_tree is tree
+    sim.relax([1])
+    assert charge.frozen_tree is not tree
+
+
+def test_relax_discards_far_field_after_tick(make_simulation):
+    sim = make_simulation().__enter__().tick(5)
+    charge = sim.forces["charge"]
+    sim.relax([0])
+    tree = charge.frozen_tree
+    sim.tick()
+    sim.relax([0])
+    assert charge.frozen_tree is not tree
+
+
+def test_cached_relax_matches_rebuilt(make_simulation):
+    cached, rebuilt, start = [make_simulation().__enter__().tick(5) for _ in range(3)]
+    for _ in range(3):
+        cached.relax([0], hops=2)
+        rebuilt.relax([0], hops=2)
+        for force in rebuilt.forces.values():
+            force.invalidate()
+    assert node_positions(cached) == node_positions(rebuilt)
+    moved = [
+        i
+        for i, (a, b) in enumerate(zip(node_positions(cached), node_positions(start)))
+        if a != b
+    ]
+    assert 0 in moved
+    assert len(moved) < len(cached.nodes)
+
+
+def test_relax_force_on_some_nodes():
+    nodes = [VPoint(float(i), 0.0) for i in range(10)]
+    sim = ForceSimulation(nodes)
+    sim.add_force("x", XForceLayout(nodes[5:], x=100.0, strength=Fn(1.0)))
+    sim.__enter__()
+    sim.relax([nodes[0], nodes[1]], hops=0)
+    assert [node.x for node in nodes] == list(range(10))
+    sim.relax([nodes[1], nodes[7]], hops=0)
+    assert nodes[1].x == 1.0
+    assert nodes[7].x > 7.0
+    assert [node.x for node in nodes[5:7] + nodes[8:]] == [5.0, 6.0, 8.0, 9.0]
@@ -0,0 +1,132 @@
+import asyncio
+import io
+import os
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from force_directed_layout.benchmarks import GENERATORS
+from force_directed_layout.service import (
+    DiskCache,
+    LayoutJob,
+    LayoutService,
+    MemoryCache,
+)
+
+
+def job(**kwargs):
+    graph = GENERATORS["tree"](100)
+    return LayoutJob(graph.n, graph.sources, graph.targets, ticks=20, **kwargs)
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(1)
+        self.calls = 0
+
+    def submit(self, *args, **kwargs):
+        self.calls += 1
+        return super().submit(*args, **kwargs)
+
+
+def test_key():
+    assert job().key() == job().key()
+    assert job().key() != job(seed=1).key()
+    assert job().key() != job(options={"dtype": np.float32}).key()
+    assert (
+        job(options={"dtype": np.float32}).key()
+        == job(options={"dtype": np.dtype("float32")}).key()
+    )
+    other = job()
+    other.targets = other.targets[::-1].copy()
+    assert job().key() != other.key()
+    with pytest.raises(TypeError):
+        job(options={"storage": object()}).key()
+
+
+def test_run_is_deterministic():
+    xy = job().run()
+    assert xy.shape == (100, 2)
+    np.testing.assert_array_equal(xy, job().run())
+
+
+def test_service_caches(tmp_path):
+    executor = CountingExecutor()
+    with LayoutService(executor=executor, directory=tmp_path) as service:
+        futures = [service.submit(job()) for _ in range(3)]
+        results = [future.result() for future in futures]
+        assert executor.calls == 1
+        assert all(result is results[0] for result in results)
+        assert not results[0].flags.writeable
+        assert service.layout(job()) is results[0]
+        np.testing.assert_array_equal(results[0], job().run())
+        assert executor.calls == 1
+
+    # A new service finds the result on disk
+    executor = CountingExecutor()
+    with LayoutService(executor=executor, directory=tmp_path) as service:
+        np.testing.assert_array_equal(service.layout(job()), results[0])
+        assert executor.calls == 0
+    executor.shutdown()
+
+
+def test_cancelling_one_request_leaves_the_others():
+    executor = CountingExecutor()
+    with LayoutService(executor=executor) as service:
+        # Hold the only worker so that the requests stay pending
+        release = threading.Event()
+        executor.submit(release.wait)
+        first = service.submit(job())
+        second = service.submit(job())
+        assert first.cancel()
+        release.set()
+        np.testing.assert_array_equal(second.result(), job().run())
+        assert first.cancelled()
+
+        async def main():
+            release.clear()
+            executor.submit(release.wait)
+            requests = [
+                asyncio.ensure_future(service.layout_async(job(seed=1)))
+                for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            requests[0].cancel()
+            await asyncio.sleep(0)
+            release.set()
+            return await requests[1]
+
+        np.testing.assert_array_equal(asyncio.run(main()), job(seed=1).run())
+        assert executor.calls == 4
+
+
+def test_service_processes():
+    with LayoutService(workers=1) as service:
+        np.testing.assert_array_equal(service.layout(job()), job().run())
+
+
+def test_memory_cache():
+    cache = MemoryCache(max_items=2)
+    cache.put("a", np.zeros(1))
+    cache.put("b", np.zeros(1))
+    cache.get("a")
+    cache.put("c", np.zeros(1))
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+
+
+def test_disk_cache(tmp_path):
+    value = np.zeros(100)
+    buffer = io.BytesIO()
+    np.save(buffer, value)
+    cache = DiskCache(tmp_path, max_bytes=2 * len(buffer.getvalue()))
+    for i, key in enumerate("abc"):
+        cache.put(key, value)
+        os.utime(cache.path(key), (i, i))
+    assert cache.get("a") is None
+    np.testing.assert_array_equal(cache.get("c"), value)
+    assert sorted(os.listdir(tmp_path)) == ["b.npy", "c.npy"]
@@ -0,0 +1,14 @@
+from force_directed_layout import (
+    ForceSimulation,
+    LinkageForceDirectedLayout,
+    ManyBodyForcesLayout,
+)
+
+
+def test_empty_link_force():
+    sim = ForceSimulation([])
+    sim.add_force("link", LinkageForceDirectedLayout([], []))
+    sim.add_force("charge", ManyBodyForcesLayout([]))
+    sim.__enter__().tick(2)
+    sim.relax([])
+    assert sim.ticks == 3
@@ -0,0 +1,129 @@
+import numpy as np
+import pytest
+
+from force_directed_layout import ForceSimulation, VPoint
+from force_directed_layout.spatial import SpatialIndex
+
+
+def brute_knn(xy, x, y, k, radius=None):
+    d2 = (xy[:, 0] - x) ** 2 + (xy[:, 1] - y) ** 2
+    candidates = np.flatnonzero(np.isfinite(d2))
+    if radius is not None:
+        candidates = candidates[d2[candidates] < radius * radius]
+    ranked = candidates[np.lexsort((candidates, d2[candidates]))]
+    return ranked[:k]
+
+
+def brute_within(xy, x, y, radius):
+    d2 = (xy[:, 0] - x) ** 2 + (xy[:, 1] - y) ** 2
+    return np.flatnonzero(d2 <= radius * radius)
+
+
+@pytest.fixture
+def xy():
+    random = np.random.RandomState(0)
+    # Points on a coarse integer lattice, so that many are exactly as far from a
+    # query as each other and many lie exactly on a radius
+    xy = random.randint(-20, 20, size=(2000, 2)).astype(float)
+    xy[::37] = np.nan
+    xy[5::41, 1] = np.inf
+    return xy
+
+
+@pytest.fixture
+def queries():
+    random = np.random.RandomState(1)
+    lattice = random.randint(-25, 25, size=(100, 2)).astype(float)
+    anywhere = random.uniform(-25, 25, size=(100, 2))
+    return np.concatenate([lattice, anywhere])
+
+
+@pytest.mark.parametrize("leaf_size", [1, 4, 16])
+@pytest.mark.parametrize("radius", [None, 0.5, 3.0, 5.0])
+def test_nearest_and_knn(xy, queries, leaf_size, radius):
+    index = SpatialIndex(xy, leaf_size=leaf_size)
+    for x, y in queries:
+        expected = brute_knn(xy, x, y, 10, radius)
+        np.testing.assert_array_equal(index.knn(x, y, 10, radius), expected)
+        assert index.nearest(x, y, radius) == (expected[0] if len(expected) else -1)
+
+
+@pytest.mark.parametrize("leaf_size", [1, 4, 16])
+@pytest.mark.parametrize("radius", [0.0, 1.0, 3.0, 5.0])
+def test_within(xy, queries, leaf_size, radius):
+    index = SpatialIndex(xy, leaf_size=leaf_size)
+    for x, y in queries:
+        np.testing.assert_array_equal(
+            index.within(x, y, radius), brute_within(xy, x, y, radius)
+        )
+
+
+def test_radius_boundary():
+    index = SpatialIndex([[3.0, 4.0], [0.0, 6.0]])
+    # Both points are exactly 5 away, which is outside of a radius of 5 for the
+    # nearest neighbor queries but inside of it for `within`
+    assert index.nearest(0, 0, 5.0) == -1
+    assert len(index.knn(0, 0, 2, 5.0)) == 0
+    np.testing.assert_array_equal(index.within(0, 0, 5.0), [0])
+    assert index.nearest(0, 0, 5.0 + 1e-9) == 0
+
+
+def test_ties_prefer_lower_index():
+    index = SpatialIndex([[1.0, 0.0], [0.0, 1.0], [-1.0, 0.0], [0.0, -1.0]])
+    assert index.nearest(0, 0) == 0
+    np.testing.assert_array_equal(index.knn(0, 0, 3), [0, 1, 2])
+
+
+def test_batches(xy, queries):
+    index = SpatialIndex(xy)
+    xs, ys = queries.T
+    k = 5
+    radius = 3.0
+
+    nearest = index.nearest_many(xs, ys, radius)
+    knn = index.knn_many(xs, ys, k, radius)
+    offsets, indices = index.within_many(xs, ys, radius)
+    assert knn.shape == (len(queries), k)
+    assert len(offsets) == len(queries) + 1
+    for i, (x, y) in enumerate(queries):
+        expected = brute_knn(xy, x, y, k, radius)
+        assert nearest[i] == (expected[0] if len(expected) else -1)
+        np.testing.assert_array_equal(knn[i, : len(expected)], expected)
+        assert (knn[i, len(expected) :] == -1).all()
+        np.testing.assert_array_equal(
+            indices[offsets[i] : offsets[i + 1]], brute_within(xy, x, y, radius)
+        )
+
+
+def test_empty():
+    index = SpatialIndex(np.full((3, 2), np.nan))
+    assert len(index) == 0
+    assert index.nearest(0, 0) == -1
+    assert len(index.knn(0, 0, 3)) == 0
+    assert len(index.within(0, 0, 10)) == 0
+    assert (index.knn_many([0, 1], [0, 1], 2) == -1).all()
+    offsets, indices = index.within_many([0, 1], [0, 1], 1)
+    np.testing.assert_array_equal(offsets, [0, 0, 0])
+    assert len(indices) == 0
+
+
+def test_find_matches_linear_scan(xy, queries):
+    nodes = [VPoint(x, y) for x, y in xy]
+    sim = ForceSimulation(nodes)
+    for i, node in enumerate(nodes):
+        node.index = i
+
+    def find(x, y, radius=None):
+        # The linear scan that `find` used to be
+        radius = float("inf") if radius is None else radius * radius
+        closest = None
+        for node in nodes:
+            d2 = (x - node.x) ** 2 + (y - node.y) ** 2
+            if d2 < radius:
+                closest = node
+                radius = d2
+        return closest
+
+    for x, y in queries:
+        for radius in (None, 3.0):
+            assert sim.find(x, y, radius) is find(x, y, radius)
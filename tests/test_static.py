@@ -0,0 +1,45 @@
+from force_directed_layout import CollisionLayout, Fn
+
+
+def simulation(make_simulation):
+    sim = make_simulation()
+    sim.add_force("collide", CollisionLayout(sim.nodes, radius=Fn(2.0)))
+    sim.__enter__().tick(5)
+    for node in sim.nodes[::3]:
+        node.fixed = True
+    for node in sim.nodes[1::7]:
+        node.fx = node.x
+        node.fy = node.y
+    return sim
+
+
+def test_static_tree_is_reused(make_simulation):
+    sim = simulation(make_simulation)
+    charge = sim.forces["charge"]
+    collide = sim.forces["collide"]
+    sim.tick()
+    trees = charge.static_quadtree, collide.static_quadtree
+    assert all(tree is not None for tree in trees)
+    sim.tick(3)
+    assert charge.static_quadtree is trees[0]
+    assert collide.static_quadtree is trees[1]
+    sim.nodes[0].x += 1.0
+    sim.tick()
+    assert charge.static_quadtree is not trees[0]
+    assert collide.static_quadtree is not trees[1]
+
+
+def test_cached_static_tree_matches_rebuilt(make_simulation):
+    cached = simulation(make_simulation)
+    rebuilt = simulation(make_simulation)
+    for i in range(10):
+        if i == 5:
+            for sim in (cached, rebuilt):
+                sim.nodes[3].x += 10.0
+        cached.tick()
+        rebuilt.tick()
+        for force in rebuilt.forces.values():
+            force.invalidate()
+    assert [(node.x, node.y) for node in cached.nodes] == [
+        (node.x, node.y) for node in rebuilt.nodes
+    ]
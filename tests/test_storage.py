@@ -0,0 +1,44 @@
+import numpy as np
+
+from force_directed_layout.storage import ArrayStorage
+
+
+def node_positions(sim):
+    return np.array([(node.x, node.y) for node in sim.nodes])
+
+
+def test_state_follows_nodes(make_simulation):
+    sim = make_simulation(200).__enter__()
+    sim.tick(3)
+    np.testing.assert_array_equal(sim.positions(), node_positions(sim))
+    state = sim.state
+    sim.tick()
+    # Ticking leaves the copy alone until it is asked for
+    assert not np.array_equal(state.x, node_positions(sim)[:, 0])
+    np.testing.assert_array_equal(sim.positions(), node_positions(sim))
+    assert sim.node_state() is state
+
+    sim.nodes[0].x = 1e6
+    sim.invalidate_index()
+    assert sim.positions()[0, 0] == 1e6
+    assert sim.find(1e6, 0) is sim.nodes[0]
+
+
+def test_memory_mapped_matches_memory(make_simulation, tmp_path):
+    expected = make_simulation(200).__enter__().tick(20).positions()
+    storage = ArrayStorage(tmp_path, chunk_size=37)
+    sim = make_simulation(200, storage=storage).__enter__().tick(20)
+    assert isinstance(sim.forces["link"].distances, np.memmap)
+    assert isinstance(sim.node_state().x, np.memmap)
+    np.testing.assert_array_equal(sim.positions(), expected)
+
+
+def test_state_dtype(make_simulation):
+    sim = make_simulation(50, dtype=np.float32).__enter__().tick()
+    assert sim.node_state().x.dtype == np.float32
+    assert sim.positions().dtype == np.float32
+
+
+def test_chunk_bytes_sets_chunk_size():
+    assert ArrayStorage(chunk_bytes=256 * 1000).chunk_size == 1000
+    assert ArrayStorage(chunk_bytes=1).chunk_size == 1